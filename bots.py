@@ -0,0 +1,374 @@
+"""Bot protocol: AI seats see a read-only observation and answer with an action.
+
+A bot subclasses ``Bot`` and implements ``act(obs) -> (action, amount)``,
+where ``amount`` is the raise-to total for RAISE as in ``PokerEngine.apply``.
+The engine itself is never handed to a bot, so a bot cannot change the table.
+
+``BotRunner`` is what the front ends and the simulator call. It builds the
+observation, gives the bot a wall-clock budget and takes a default action
+(check if free, otherwise fold) when the bot runs over it or answers with
+something illegal, so one slow bot cannot stall a table or a simulation
+batch. Every decision's latency goes into a ``LatencyHistogram``.
+
+    runner = BotRunner(MySearchBot(), budget=0.5)
+    engine.apply(*runner.decide(engine))
+
+A front end that must keep drawing while a bot thinks uses ``start`` instead,
+which returns at once with a ``Decision`` to poll between frames.
+"""
+
+import bisect
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from hand_strength import hand_strength, win_probability
+from poker_engine import (ALL_IN, BOARD_SIZES, CHECK_CALL, FOLD, MIN_BET, PREFLOP, RAISE, PokerEngine,
+                          heuristic_decision)
+from push_fold import PushFoldTable, default_table
+
+Action = Tuple[str, int]
+
+# EquityBot bets or raises when its chance to win is this many times a fair
+# share (1 / players still in), and moves all-in from this absolute chance.
+RAISE_EDGE = 1.5
+ALL_IN_WIN = 0.8
+# How often it bets a weak hand when checking is free.
+BLUFF = 0.1
+
+# Histogram bucket upper bounds: 10 us doubling up to about 10 s.
+LATENCY_BOUNDS = [1e-5 * 2 ** k for k in range(21)]
+
+
+class Observation(NamedTuple):
+    """What the player to act may know, as an immutable snapshot."""
+    seat: int
+    street: int
+    hole: Tuple[int, int]
+    board: Tuple[int, ...]           # visible community cards only
+    pot: int
+    bet_on: int
+    stacks: Tuple[int, ...]
+    in_round: Tuple[bool, ...]
+    legal_actions: Tuple[str, ...]
+    raise_bounds: Tuple[int, int]    # (0, 0) when raising is not legal
+    history: Tuple[Tuple[int, int, str, int], ...]
+
+
+def observe(engine: PokerEngine) -> Observation:
+    """Snapshot the engine from the point of view of ``engine.current_player``."""
+    seat = engine.current_player
+    legal = tuple(engine.legal_actions())
+    return Observation(
+        seat=seat,
+        street=engine.street,
+        hole=tuple(engine.players[seat].cards),
+        board=tuple(engine.tableCards[:BOARD_SIZES[engine.street]]),
+        pot=engine.pot,
+        bet_on=engine.betOn,
+        stacks=tuple(p.money for p in engine.players),
+        in_round=tuple(p.round for p in engine.players),
+        legal_actions=legal,
+        raise_bounds=engine.raise_bounds() if RAISE in legal else (0, 0),
+        history=tuple(engine.history),
+    )
+
+
+def default_action(obs: Observation) -> Action:
+    """Check when it costs nothing, fold otherwise."""
+    if obs.bet_on == 0 and CHECK_CALL in obs.legal_actions:
+        return CHECK_CALL, 0
+    return FOLD, 0
+
+
+class Bot:
+    """Base class for AI players."""
+
+    name = "bot"
+
+    def act(self, obs: Observation) -> Action:
+        raise NotImplementedError
+
+    def reseed(self, rng):
+        """Draw any random numbers from ``rng`` from now on. The simulator hands
+        every bot the stream of the hand being played, so hands replay exactly."""
+
+
+class HeuristicBot(Bot):
+    """The original table AI (``heuristic_decision``) behind the bot protocol."""
+
+    name = "heuristic"
+
+    def __init__(self, rng=None):
+        self.rng = rng  # a RandomSource or random.Random; None: the global random module
+
+    def act(self, obs: Observation) -> Action:
+        return heuristic_decision(obs.hole, obs.stacks[obs.seat], obs.bet_on, self.rng or random)
+
+    def reseed(self, rng):
+        self.rng = rng
+
+
+def equity_edge(obs: Observation) -> Tuple[float, float]:
+    """(chance to beat every live opponent, fair share of the pot) for the player to act."""
+    opponents = sum(obs.in_round) - 1
+    return win_probability(hand_strength(obs.hole, obs.board), opponents), 1.0 / (opponents + 1)
+
+
+def equity_decision(obs: Observation, rng=random) -> Action:
+    """Raise with an edge over the live opponents, call when the chance to win
+    beats the price, otherwise check or fold. Strength counts the board, so a
+    made hand plays strong whatever the rank of the hole cards."""
+    win, fair = equity_edge(obs)
+    legal = obs.legal_actions
+    to_call = min(obs.bet_on, obs.stacks[obs.seat])
+    if win >= ALL_IN_WIN:
+        return ALL_IN, 0
+    if RAISE in legal and (win >= RAISE_EDGE * fair or (to_call == 0 and rng.random() < BLUFF)):
+        low, high = obs.raise_bounds
+        # Bet up to the pot, more the bigger the edge
+        raise_to = obs.bet_on + int(obs.pot * min(max(win / fair - 1.0, 0.0), 1.0))
+        return RAISE, min(max(raise_to, low), high)
+    if to_call == 0:
+        return CHECK_CALL, 0
+    if win >= to_call / (obs.pot + to_call):
+        return (CHECK_CALL if CHECK_CALL in legal else ALL_IN), 0
+    return FOLD, 0
+
+
+class EquityBot(Bot):
+    """Plays ``equity_decision`` from cached hand strengths (see hand_strength.py)."""
+
+    name = "equity"
+
+    def __init__(self, rng=None):
+        self.rng = rng  # a RandomSource or random.Random; None: the global random module
+
+    def act(self, obs: Observation) -> Action:
+        return equity_decision(obs, self.rng or random)
+
+    def reseed(self, rng):
+        self.rng = rng
+
+
+class PushFoldBot(Bot):
+    """Heads-up preflop with short stacks, shoves and calls shoves by a solved
+    push/fold table (see push_fold.py); ``fallback`` plays every other spot.
+
+    Stacks are short up to ``table.max_stack`` minimum bets. The game has no
+    blinds, so with no dead money in the pot the table's deepest row (the
+    tightest ranges) is used.
+    """
+
+    name = "push/fold"
+
+    def __init__(self, fallback: Bot, table: Optional[PushFoldTable] = None, rng=None):
+        self.fallback = fallback
+        self.table = table or default_table()
+        self.rng = rng  # a RandomSource or random.Random; None: the global random module
+
+    def _stack_ratio(self, behind: int, dead: int) -> Optional[float]:
+        """Stack behind in units of dead money, or None when the stack is not short."""
+        if not behind or behind > self.table.max_stack * MIN_BET:
+            return None
+        return min(behind / dead, self.table.max_stack) if dead else self.table.max_stack
+
+    def act(self, obs: Observation) -> Action:
+        if obs.street == PREFLOP and sum(obs.in_round) == 2:
+            rng = self.rng or random
+            opponent = next(i for i, live in enumerate(obs.in_round) if live and i != obs.seat)
+            stack, theirs = obs.stacks[obs.seat], obs.stacks[opponent]
+            if obs.bet_on == 0:
+                behind = min(stack, theirs)
+                ratio = self._stack_ratio(behind, obs.pot)
+                if ratio is not None:
+                    if rng.random() >= self.table.push_probability(ratio, obs.hole):
+                        return CHECK_CALL, 0
+                    # Shove no more than the opponent can call
+                    return (ALL_IN, 0) if behind == stack else (RAISE, behind)
+            elif theirs == 0:
+                # Facing an all-in: the shove is what there is to call
+                ratio = self._stack_ratio(obs.bet_on, obs.pot - obs.bet_on)
+                if ratio is not None:
+                    if rng.random() < self.table.call_probability(ratio, obs.hole):
+                        return (CHECK_CALL if CHECK_CALL in obs.legal_actions else ALL_IN), 0
+                    return FOLD, 0
+        return self.fallback.act(obs)
+
+    def reseed(self, rng):
+        self.rng = rng
+        self.fallback.reseed(rng)
+
+
+class LatencyHistogram:
+    """Decision times in log-spaced buckets, plus counts of budget overruns
+    and of decisions the bot failed with an exception."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.timeouts += other.timeouts
+        self.errors += other.errors
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the ``q``-th percentile."""
+        target = q / 100.0 * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BOUNDS + [self.max], self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(bound, self.max)
+        return 0.0
+
+    def summary(self) -> Dict[str, float]:
+        n = self.count
+        return {
+            "count": n,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "mean_ms": 1000.0 * self.total / n if n else 0.0,
+            "p50_ms": 1000.0 * self.percentile(50),
+            "p99_ms": 1000.0 * self.percentile(99),
+            "max_ms": 1000.0 * self.max,
+        }
+
+
+class Decision:
+    """A decision running on a runner's worker thread (see ``BotRunner.start``)."""
+
+    def __init__(self, runner: "BotRunner", obs: Observation, future=None):
+        self.runner = runner
+        self.obs = obs
+        self.future = future  # None: the bot is still busy with an abandoned decision
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        if future is not None:
+            future.add_done_callback(self._finish)
+
+    def _finish(self, future):
+        self.finished = time.perf_counter()
+
+    def ready(self) -> bool:
+        """True once the bot has answered or its budget is spent; never blocks."""
+        if self.future is None or self.future.done():
+            return True
+        budget = self.runner.budget
+        return budget is not None and time.perf_counter() - self.started >= budget
+
+    def action(self) -> Action:
+        """The action to apply, once ``ready``: the bot's answer, or the default
+        action if it ran over its budget, raised, or answered with something illegal."""
+        runner = self.runner
+        action = None
+        if self.future is not None and self.future.done():
+            try:
+                action = self.future.result()
+            except Exception:
+                runner.latency.errors += 1
+            runner.latency.record((self.finished or time.perf_counter()) - self.started)
+        else:
+            runner.latency.record(time.perf_counter() - self.started)
+            runner.latency.timeouts += 1
+        if action is None or action[0] not in self.obs.legal_actions:
+            return default_action(self.obs)
+        return action
+
+
+class BotRunner:
+    """Calls a bot with an optional per-decision budget (seconds) and times it.
+
+    With ``budget=None`` ``decide`` runs the bot inline; otherwise it runs on a
+    worker thread and the runner stops waiting when the budget is spent. A bot
+    still busy with an abandoned decision is not asked again until it finishes.
+    A bot that raises gets the default action, like one that runs out of time.
+    """
+
+    def __init__(self, bot: Bot, budget: Optional[float] = None):
+        self.bot = bot
+        self.budget = budget
+        self.latency = LatencyHistogram()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = None
+
+    def __getstate__(self):
+        # Runners travel to simulator worker processes; threads do not.
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_pending"] = None
+        return state
+
+    def __call__(self, engine: PokerEngine) -> Action:
+        return self.decide(engine)
+
+    def decide(self, engine: PokerEngine) -> Action:
+        obs = observe(engine)
+        start = time.perf_counter()
+        if self.budget is None:
+            try:
+                action = self.bot.act(obs)
+            except Exception:
+                self.latency.errors += 1
+                action = None
+        else:
+            action = self._act_with_budget(obs)
+        self.latency.record(time.perf_counter() - start)
+        if action is None or action[0] not in obs.legal_actions:
+            return default_action(obs)
+        return action
+
+    def start(self, engine: PokerEngine) -> Decision:
+        """Hand the decision for the player to act to the worker thread and
+        return without waiting; poll ``Decision.ready`` and then apply
+        ``Decision.action``. The budget, if any, still applies."""
+        obs = observe(engine)
+        if self._pending is not None and not self._pending.done():
+            return Decision(self, obs)
+        self._pending = self._worker().submit(self.bot.act, obs)
+        return Decision(self, obs, self._pending)
+
+    def _worker(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bot-{self.bot.name}")
+        return self._executor
+
+    def _act_with_budget(self, obs: Observation) -> Optional[Action]:
+        if self._pending is not None and not self._pending.done():
+            self.latency.timeouts += 1
+            return None
+        self._pending = self._worker().submit(self.bot.act, obs)
+        try:
+            return self._pending.result(timeout=self.budget)
+        except TimeoutError:
+            self.latency.timeouts += 1
+            return None
+        except Exception:
+            self.latency.errors += 1
+            return None
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def latency_report(runners: List[BotRunner]) -> List[Dict[str, float]]:
+    """One ``LatencyHistogram.summary`` per runner, tagged with the bot's name."""
+    return [dict(bot=r.bot.name, **r.latency.summary()) for r in runners]
@@ -0,0 +1,42 @@
+"""Integer card encoding shared by the evaluator, the deck and the game.
+
+A card is an int in 0..51: ``suit * 13 + rank``, where rank 0 is a deuce and
+rank 12 is an ace. A fresh ``Deck`` holds the codes in this order.
+"""
+
+NUM_RANKS = 13
+NUM_SUITS = 4
+NUM_CARDS = NUM_RANKS * NUM_SUITS
+
+# Placeholder for a card that has not been dealt yet.
+NO_CARD = -1
+
+
+def card_code(suit: int, rank: int) -> int:
+    return suit * NUM_RANKS + rank
+
+
+def card_rank(code: int) -> int:
+    return code % NUM_RANKS
+
+
+def card_suit(code: int) -> int:
+    return code // NUM_RANKS
+
+
+class Card:
+    """Display-side view of a card code; the game itself passes plain ints around."""
+
+    __slots__ = ("suit", "rank")
+
+    def __init__(self, suit: int = 0, rank: int = 0):
+        self.suit = suit
+        self.rank = rank
+
+    @classmethod
+    def from_code(cls, code: int) -> "Card":
+        return cls(card_suit(code), card_rank(code))
+
+    @property
+    def code(self) -> int:
+        return card_code(self.suit, self.rank)
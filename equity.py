@@ -0,0 +1,211 @@
+"""Hand equity: Monte Carlo sampling and exact enumeration.
+
+``calculate_equity`` deals random runouts of the unknown board cards, scores
+every player with the batch evaluator and counts wins, ties and losses. Large
+runs are split across a process pool; each chunk gets its own RNG stream
+spawned from one ``SeedSequence``, so a given seed always reproduces the same
+numbers for the same worker count.
+
+``exact_equity`` is for the flop and later, where every runout can be dealt:
+at most C(45, 2) = 990 heads-up on the flop. Spots are reduced to a canonical
+suit labelling before they are looked up in a cache, and runouts that only
+differ by swapping suits nobody holds are scored once and weighted.
+"""
+
+import atexit
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations, permutations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cards import NUM_CARDS, NUM_SUITS, card_code, card_rank, card_suit
+from hand_evaluator import evaluate7, evaluate_batch
+
+# Below this many samples per chunk, shipping work to another process costs more
+# than it saves.
+MIN_CHUNK = 20000
+# Samples scored per NumPy batch inside a chunk; bounds memory per worker.
+BATCH_SIZE = 50000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Reuse one pool across calls so interactive callers do not pay start-up each time."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _validate(hole_cards_per_player: Sequence[Sequence[int]], board: Sequence[int]):
+    if len(hole_cards_per_player) < 2:
+        raise ValueError("equity needs at least two players")
+    if any(len(hole) != 2 for hole in hole_cards_per_player):
+        raise ValueError("every player needs exactly two hole cards")
+    if len(board) > 5:
+        raise ValueError("the board has at most five cards")
+    known = [c for hole in hole_cards_per_player for c in hole] + list(board)
+    if any(c < 0 or c >= NUM_CARDS for c in known):
+        raise ValueError("card codes must be in 0..51")
+    if len(set(known)) != len(known):
+        raise ValueError("the same card appears twice")
+
+
+def _percentages(wins: Sequence[int], ties: Sequence[int], shares: Sequence[float],
+                 total: int) -> List[Dict[str, float]]:
+    return [{"win": 100.0 * w / total, "tie": 100.0 * t / total, "lose": 100.0 * (total - w - t) / total,
+             "equity": 100.0 * s / total}
+            for w, t, s in zip(wins, ties, shares)]
+
+
+def _draw_runouts(rng: np.random.Generator, live: np.ndarray, count: int, need: int) -> np.ndarray:
+    """Draw ``count`` rows of ``need`` distinct cards from ``live``."""
+    idx = rng.integers(0, len(live), size=(count, need))
+    while need > 1:
+        ordered = np.sort(idx, axis=1)
+        bad = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if not bad.size:
+            break
+        idx[bad] = rng.integers(0, len(live), size=(bad.size, need))
+    return live[idx]
+
+
+def _simulate(holes: np.ndarray, board: np.ndarray, iterations: int,
+              seed: np.random.SeedSequence) -> np.ndarray:
+    """Play ``iterations`` runouts; returns (3, players) counts of wins and ties
+    and the pots won, split pots counted as the fraction each winner gets."""
+    rng = np.random.default_rng(seed)
+    players = len(holes)
+    live = np.setdiff1d(np.arange(NUM_CARDS), np.concatenate([holes.ravel(), board]))
+    need = 5 - len(board)
+    counts = np.zeros((3, players), dtype=np.float64)
+
+    done = 0
+    while done < iterations:
+        n = min(BATCH_SIZE, iterations - done)
+        hands = np.empty((n, 7), dtype=np.intp)
+        hands[:, 2:2 + len(board)] = board
+        if need:
+            hands[:, 2 + len(board):] = _draw_runouts(rng, live, n, need)
+        strengths = np.empty((players, n), dtype=np.uint16)
+        for p in range(players):
+            hands[:, :2] = holes[p]
+            strengths[p] = evaluate_batch(hands)
+        is_best = strengths == strengths.max(axis=0)
+        shared = is_best.sum(axis=0) > 1
+        counts[0] += (is_best & ~shared).sum(axis=1)
+        counts[1] += (is_best & shared).sum(axis=1)
+        counts[2] += (is_best / is_best.sum(axis=0)).sum(axis=1)
+        done += n
+    return counts
+
+
+def calculate_equity(hole_cards_per_player: Sequence[Sequence[int]], board: Sequence[int] = (),
+                     iterations: int = 100000, workers: Optional[int] = None,
+                     seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Estimate each player's chances from known hole cards and board (card codes).
+
+    Returns one dict per player with "win", "tie" and "lose" percentages and
+    "equity", the percentage of the pot won on average (a split pot counts as
+    the winner's share of it), which adds up to 100 over the players.
+    ``workers`` defaults to the CPU count; small runs stay in this process.
+    """
+    _validate(hole_cards_per_player, board)
+    if iterations <= 0:
+        raise ValueError("iterations must be positive")
+    holes = np.array(hole_cards_per_player, dtype=np.intp)
+    board_arr = np.array(board, dtype=np.intp)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = max(1, min(workers, iterations // MIN_CHUNK))
+    sizes = [iterations // chunks + (i < iterations % chunks) for i in range(chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+
+    if chunks == 1:
+        counts = _simulate(holes, board_arr, iterations, seeds[0])
+    else:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_simulate, holes, board_arr, n, s) for n, s in zip(sizes, seeds)]
+        counts = sum(f.result() for f in futures)
+
+    return _percentages([int(w) for w in counts[0]], [int(t) for t in counts[1]], counts[2].tolist(), iterations)
+
+
+def _relabel(cards, mapping) -> Tuple[int, ...]:
+    return tuple(sorted(card_code(mapping[card_suit(c)], card_rank(c)) for c in cards))
+
+
+def _canonical_spot(hole_cards_per_player: Sequence[Sequence[int]], board: Sequence[int]):
+    """Pick the smallest of the 24 suit relabellings of a spot; equity is the same for all."""
+    best = None
+    for mapping in permutations(range(NUM_SUITS)):
+        key = (tuple(_relabel(hole, mapping) for hole in hole_cards_per_player), _relabel(board, mapping))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+@lru_cache(maxsize=4096)
+def _exact_counts(holes: Tuple[Tuple[int, ...], ...], board: Tuple[int, ...]):
+    """Enumerate every runout of a canonical spot; returns (wins, ties, pots won
+    with split pots counted fractionally, runouts)."""
+    known = [c for hole in holes for c in hole] + list(board)
+    live = [c for c in range(NUM_CARDS) if c not in known]
+    used = {card_suit(c) for c in known}
+    free = [s for s in range(NUM_SUITS) if s not in used]
+    relabellings = []
+    if len(free) > 1:
+        for order in permutations(free):
+            mapping = list(range(NUM_SUITS))
+            for src, dst in zip(free, order):
+                mapping[src] = dst
+            relabellings.append(mapping)
+
+    runouts = Counter()
+    for runout in combinations(live, 5 - len(board)):
+        if relabellings:
+            runout = min(_relabel(runout, mapping) for mapping in relabellings)
+        runouts[runout] += 1
+
+    wins = [0] * len(holes)
+    ties = [0] * len(holes)
+    shares = [0.0] * len(holes)
+    for runout, weight in runouts.items():
+        cards = list(board) + list(runout)
+        strengths = [evaluate7(list(hole) + cards) for hole in holes]
+        best = max(strengths)
+        winners = [p for p, s in enumerate(strengths) if s == best]
+        for p in winners:
+            shares[p] += weight / len(winners)
+            if len(winners) == 1:
+                wins[p] += weight
+            else:
+                ties[p] += weight
+    return wins, ties, shares, sum(runouts.values())
+
+
+def exact_equity(hole_cards_per_player: Sequence[Sequence[int]], board: Sequence[int]) -> List[Dict[str, float]]:
+    """Exact win/tie/lose percentages once at least the flop is out.
+
+    Same result format as ``calculate_equity``, without sampling noise.
+    """
+    _validate(hole_cards_per_player, board)
+    if len(board) < 3:
+        raise ValueError("exact equity needs at least the flop; use calculate_equity preflop")
+    wins, ties, shares, total = _exact_counts(*_canonical_spot(hole_cards_per_player, board))
+    return _percentages(wins, ties, shares, total)
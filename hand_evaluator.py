@@ -0,0 +1,367 @@
+"""Table-driven poker hand evaluator.
+
+Every hand maps to a single integer strength: higher beats lower, equal values
+tie. Strengths run from 1 (7-5-4-3-2 offsuit) to 7462 (royal flush); 0 means
+"no hand". The ordering is the one ``PokerGame.get_hand_score`` used to produce
+with tuples (category first, then kickers), with the wheel counted as a
+5-high straight.
+
+Cards are ints as described in ``cards.py``. Five-card lookups go through
+three tables:
+
+- flushes are indexed by the 13-bit mask of their ranks;
+- five distinct ranks without a flush are indexed the same way;
+- paired hands are indexed by a perfect hash of their rank multiset: every
+  rank has a key and the keys were chosen so that the sum over any five cards
+  is unique, so the sum can index the table directly.
+
+Seven-card hands (two hole cards plus the board) are ranked in one pass rather
+than by trying 5-card subsets. Each card contributes a 7-card rank key in the
+low bits and a 3-bit suit counter in the high bits of a single sum. The suit
+counters tell whether some suit has five or more cards; if so the best hand is
+looked up by that suit's rank mask, otherwise the rank-key sum indexes a table
+holding the best 5-card hand of every 7-card rank multiset.
+
+``evaluate_batch`` runs the same 7-card lookups over a whole NumPy array of
+hands at once.
+
+The tables add up to about 16 MB. They are generated once, written to a
+versioned file (see ``default_table_path``) and memory-mapped read-only on
+import, so every process on the machine shares one copy of the pages.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cards import NUM_CARDS, NUM_RANKS, NUM_SUITS, card_rank, card_suit
+
+HAND_NAMES = [
+    "High Card",
+    "Pair",
+    "Two Pair",
+    "Three of a Kind",
+    "Straight",
+    "Flush",
+    "Full House",
+    "Four of a Kind",
+    "Straight Flush",
+]
+
+# Smallest keys (found by greedy search) whose 5-card multiset sums never collide.
+RANK_KEYS_5 = [0, 1, 5, 22, 94, 312, 992, 2422, 5624, 12522, 19998, 43258, 79415]
+# The same property for 7-card multisets (keys from SKPokerEval).
+RANK_KEYS_7 = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+
+# Suit counters live above the largest possible 7-card rank-key sum.
+SUIT_SHIFT = 23
+RANK_KEY_MASK = (1 << SUIT_SHIFT) - 1
+
+# On-disk table file: header, one entry per table, then the 8-byte aligned arrays.
+# Bump TABLE_VERSION whenever the contents or layout of any table change.
+TABLE_MAGIC = b"PKEV"
+TABLE_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<16scxxxxxxxQQ")
+_TABLE_NAMES = ("flush5", "unique5", "paired5", "categories", "rank7", "flush7", "flush_suit")
+
+WHEEL = [12, 3, 2, 1, 0]
+
+
+def _rank_multisets(size: int, max_rank: int = NUM_RANKS - 1, per_rank: int = 4):
+    """Yield non-increasing rank lists of length ``size`` with at most 4 of a rank."""
+    if size == 0:
+        yield []
+        return
+    for r in range(max_rank, -1, -1):
+        for count in range(1, min(per_rank, size) + 1):
+            for rest in _rank_multisets(size - count, r - 1, per_rank):
+                yield [r] * count + rest
+
+
+def _straight_high(ranks: List[int]) -> int:
+    """Return the top rank of a 5-card straight, or -1. ``ranks`` is sorted high to low."""
+    if ranks == WHEEL:
+        return 3
+    if len(set(ranks)) == 5 and ranks[0] - ranks[4] == 4:
+        return ranks[0]
+    return -1
+
+
+def reference_score(ranks: List[int], is_flush: bool) -> Tuple[int, ...]:
+    """Score five ranks (high to low) as a comparable tuple: (category, values...).
+
+    This is the slow, readable definition the lookup tables are generated from.
+    """
+    counts = {}
+    for r in ranks:
+        counts[r] = counts.get(r, 0) + 1
+    groups = sorted(((n, r) for r, n in counts.items()), reverse=True)
+    straight_high = _straight_high(ranks)
+
+    if straight_high >= 0 and is_flush:
+        return (8, straight_high)
+    if groups[0][0] == 4:
+        return (7, groups[0][1], groups[1][1])
+    if groups[0][0] == 3 and groups[1][0] == 2:
+        return (6, groups[0][1], groups[1][1])
+    if is_flush:
+        return (5,) + tuple(ranks)
+    if straight_high >= 0:
+        return (4, straight_high)
+    if groups[0][0] == 3:
+        return (3, groups[0][1], groups[1][1], groups[2][1])
+    if groups[0][0] == 2 and groups[1][0] == 2:
+        return (2, groups[0][1], groups[1][1], groups[2][1])
+    if groups[0][0] == 2:
+        return (1,) + tuple(r for _, r in groups)
+    return (0,) + tuple(ranks)
+
+
+def _rank_mask(ranks) -> int:
+    mask = 0
+    for r in ranks:
+        mask |= 1 << r
+    return mask
+
+
+def _build_tables5():
+    flush_hands = list(_rank_multisets(5, per_rank=1))
+    plain_hands = list(_rank_multisets(5))
+    scores = [(reference_score(r, True), r, True) for r in flush_hands]
+    scores += [(reference_score(r, False), r, False) for r in plain_hands]
+    scores.sort()
+
+    flush5 = array('H', bytes(2 << NUM_RANKS))
+    unique5 = array('H', bytes(2 << NUM_RANKS))
+    paired5 = array('H', bytes(2 * (4 * RANK_KEYS_5[-1] + RANK_KEYS_5[-2] + 1)))
+    categories = array('h', [-1])
+
+    strength = 0
+    previous = None
+    for score, ranks, is_flush in scores:
+        if score != previous:
+            strength += 1
+            categories.append(score[0])
+            previous = score
+        if is_flush:
+            flush5[_rank_mask(ranks)] = strength
+        elif len(set(ranks)) == 5:
+            unique5[_rank_mask(ranks)] = strength
+        else:
+            key = sum(RANK_KEYS_5[r] for r in ranks)
+            if paired5[key]:
+                raise RuntimeError("rank keys collide for %r" % (ranks,))
+            paired5[key] = strength
+    return flush5, unique5, paired5, categories
+
+
+def _build_tables7(flush5, unique5, paired5):
+    def plain_strength5(ranks):
+        mask = _rank_mask(ranks)
+        return unique5[mask] or paired5[sum(RANK_KEYS_5[r] for r in ranks)]
+
+    rank7 = array('H', bytes(2 * (4 * RANK_KEYS_7[-1] + 3 * RANK_KEYS_7[-2] + 1)))
+    for ranks in _rank_multisets(7):
+        key = sum(RANK_KEYS_7[r] for r in ranks)
+        if rank7[key]:
+            raise RuntimeError("rank keys collide for %r" % (ranks,))
+        rank7[key] = max(plain_strength5(sub) for sub in set(combinations(ranks, 5)))
+
+    flush7 = array('H', bytes(2 << NUM_RANKS))
+    for size in (5, 6, 7):
+        for ranks in _rank_multisets(size, per_rank=1):
+            flush7[_rank_mask(ranks)] = max(flush5[_rank_mask(sub)] for sub in combinations(ranks, 5))
+
+    # Index by the packed suit counters; the value is the flush suit or -1.
+    flush_suit = array('h', [-1]) * (1 << (3 * NUM_SUITS))
+    for counters in range(len(flush_suit)):
+        for suit in range(NUM_SUITS):
+            if (counters >> (3 * suit)) & 7 >= 5:
+                flush_suit[counters] = suit
+    return rank7, flush7, flush_suit
+
+
+def build_tables() -> Dict[str, array]:
+    """Generate every lookup table from ``reference_score`` (takes about a second)."""
+    flush5, unique5, paired5, categories = _build_tables5()
+    rank7, flush7, flush_suit = _build_tables7(flush5, unique5, paired5)
+    return {
+        "flush5": flush5,
+        "unique5": unique5,
+        "paired5": paired5,
+        "categories": categories,
+        "rank7": rank7,
+        "flush7": flush7,
+        "flush_suit": flush_suit,
+    }
+
+
+def default_table_path() -> str:
+    """Where the table file lives: $POKER_TABLES, else the user cache directory."""
+    path = os.environ.get("POKER_TABLES")
+    if path:
+        return path
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "poker", "hand_tables-v%d.bin" % TABLE_VERSION)
+
+
+def write_tables(path: str, tables: Dict[str, array]):
+    """Write tables to ``path`` atomically so readers never see a partial file."""
+    header_size = _HEADER.size + _ENTRY.size * len(tables)
+    offset = (header_size + 7) & ~7
+    header = [_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(tables))]
+    for name, table in tables.items():
+        header.append(_ENTRY.pack(name.encode(), table.typecode.encode(), offset, len(table)))
+        offset = (offset + table.itemsize * len(table) + 7) & ~7
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".hand_tables-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(header))
+            for table in tables.values():
+                f.write(bytes(-f.tell() % 8))
+                table.tofile(f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def open_tables(path: str) -> Optional[Dict[str, memoryview]]:
+    """Map a table file read-only; returns None if it is missing or stale.
+
+    The pages are shared by every process that maps the same file, so a pool of
+    workers pays for the tables once.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < _HEADER.size:
+        return None
+    magic, version, count = _HEADER.unpack_from(mapped, 0)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        return None
+
+    view = memoryview(mapped)
+    tables = {}
+    for i in range(count):
+        name, typecode, offset, length = _ENTRY.unpack_from(mapped, _HEADER.size + i * _ENTRY.size)
+        typecode = typecode.decode()
+        end = offset + array(typecode).itemsize * length
+        if end > len(mapped):
+            return None
+        tables[name.rstrip(b"\0").decode()] = view[offset:end].cast(typecode)
+    if set(tables) != set(_TABLE_NAMES):
+        return None
+    return tables
+
+
+def load_tables(path: Optional[str] = None):
+    """Map the cached tables, generating and caching them first if needed."""
+    path = path or default_table_path()
+    tables = open_tables(path)
+    if tables is not None:
+        return tables
+    generated = build_tables()
+    try:
+        write_tables(path, generated)
+    except OSError:
+        return generated
+    return open_tables(path) or generated
+
+
+_TABLES = load_tables()
+_FLUSH5 = _TABLES["flush5"]
+_UNIQUE5 = _TABLES["unique5"]
+_PAIRED5 = _TABLES["paired5"]
+_CATEGORIES = _TABLES["categories"]
+_RANK7 = _TABLES["rank7"]
+_FLUSH7 = _TABLES["flush7"]
+_FLUSH_SUIT = _TABLES["flush_suit"]
+MAX_STRENGTH = len(_CATEGORIES) - 1
+
+_RANK_BIT = [1 << card_rank(c) for c in range(NUM_CARDS)]
+_KEY5 = [RANK_KEYS_5[card_rank(c)] for c in range(NUM_CARDS)]
+_KEY7 = [RANK_KEYS_7[card_rank(c)] + (1 << (SUIT_SHIFT + 3 * card_suit(c))) for c in range(NUM_CARDS)]
+
+# NumPy views of the same tables for evaluate_batch (no copies of the big ones).
+_RANK7_NP = np.frombuffer(_RANK7, dtype=np.uint16)
+_FLUSH7_NP = np.frombuffer(_FLUSH7, dtype=np.uint16)
+_FLUSH_SUIT_NP = np.frombuffer(_FLUSH_SUIT, dtype=np.int16)
+_RANK_BIT_NP = np.array(_RANK_BIT, dtype=np.int64)
+_KEY7_NP = np.array(_KEY7, dtype=np.int64)
+
+
+def evaluate5(c1: int, c2: int, c3: int, c4: int, c5: int) -> int:
+    """Strength of a 5-card hand given as card codes."""
+    mask = _RANK_BIT[c1] | _RANK_BIT[c2] | _RANK_BIT[c3] | _RANK_BIT[c4] | _RANK_BIT[c5]
+    if c1 // 13 == c2 // 13 == c3 // 13 == c4 // 13 == c5 // 13:
+        return _FLUSH5[mask]
+    strength = _UNIQUE5[mask]
+    if strength:
+        return strength
+    return _PAIRED5[_KEY5[c1] + _KEY5[c2] + _KEY5[c3] + _KEY5[c4] + _KEY5[c5]]
+
+
+def evaluate7(cards: Sequence[int]) -> int:
+    """Strength of the best 5-card hand among 7 card codes."""
+    key = 0
+    for c in cards:
+        key += _KEY7[c]
+    suit = _FLUSH_SUIT[key >> SUIT_SHIFT]
+    if suit < 0:
+        return _RANK7[key & RANK_KEY_MASK]
+    mask = 0
+    for c in cards:
+        if c // 13 == suit:
+            mask |= _RANK_BIT[c]
+    return _FLUSH7[mask]
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """Strengths of many 7-card hands: (N, 7) card codes in, (N,) uint16 out."""
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2 or cards.shape[1] != 7:
+        raise ValueError("expected an (N, 7) array of card codes, got shape %r" % (cards.shape,))
+    keys = _KEY7_NP[cards].sum(axis=1)
+    strengths = _RANK7_NP[keys & RANK_KEY_MASK]
+    suits = _FLUSH_SUIT_NP[keys >> SUIT_SHIFT]
+    flushed = np.flatnonzero(suits >= 0)
+    if flushed.size:
+        flush_cards = cards[flushed]
+        in_suit = flush_cards // 13 == suits[flushed, None]
+        # Cards of one suit have distinct ranks, so summing their bits is an OR.
+        masks = np.where(in_suit, _RANK_BIT_NP[flush_cards], 0).sum(axis=1)
+        strengths[flushed] = _FLUSH7_NP[masks]
+    return strengths
+
+
+def best_five(cards: Sequence[int]) -> Tuple[int, ...]:
+    """Return the 5 of the given cards that make the best hand (for display)."""
+    return max(combinations(cards, 5), key=lambda hand: evaluate5(*hand))
+
+
+def hand_category(strength: int) -> int:
+    """Index into ``HAND_NAMES`` for a strength, or -1 for no hand."""
+    if strength <= 0 or strength > MAX_STRENGTH:
+        return -1
+    return _CATEGORIES[strength]
+
+
+def hand_name(strength: int) -> str:
+    category = hand_category(strength)
+    if category < 0:
+        return "Unknown Hand"
+    return HAND_NAMES[category]
@@ -0,0 +1,339 @@
+"""Compact binary hand histories.
+
+A history file starts with a 5-byte header (magic b"PKHH", format version)
+followed by one record per hand, each prefixed with its length as a varint.
+A record holds:
+
+    varint  seat 0's starting stack
+    byte    mask of the other seats whose stack differs from seat 0's,
+            then a varint stack for each of them
+    byte    number of board cards dealt (0..5)
+    bits    card codes, 6 bits each, little-endian packed: two hole cards for
+            every seat that had money (seat order), then the board
+    varint  number of actions, then one byte per action
+            (street << 5 | seat << 2 | action), followed for a raise by a
+            varint of the chips it put in; what a call or all-in pays follows
+            from the stacks and the bet, so it is not stored
+    byte    number of awards, then (byte seat, varint amount) for each
+
+A short hand takes about 40 bytes, a long self-play hand with two dozen
+actions about 55. ``HandHistoryWriter`` appends
+records through an in-memory buffer that is flushed to disk when it grows
+past ``FLUSH_BYTES`` or ``FLUSH_SECONDS`` have passed since the last flush.
+
+``read_hands`` streams records back from a file in fixed-size blocks, so
+memory stays constant however long the file is, and ``replay_hand`` feeds a
+record's actions through ``PokerEngine`` and checks it ends with the same
+awards and stacks:
+
+    python hand_history.py hands.bin   # replay and verify every hand
+"""
+
+import os
+import struct
+import sys
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from poker_engine import ACTIONS, ALL_IN, BOARD_SIZES, CHECK_CALL, NUM_SEATS, RAISE, PokerEngine
+
+HISTORY_MAGIC = b"PKHH"
+HISTORY_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+
+CARD_BITS = 6
+FLUSH_BYTES = 64 * 1024
+FLUSH_SECONDS = 1.0
+READ_BLOCK = 1 << 20
+
+_ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+class HandRecord(NamedTuple):
+    """One finished hand, as stored in a history file."""
+    stacks: Tuple[int, ...]                    # money of each seat when dealt
+    holes: Tuple[Tuple[int, int], ...]         # per seat; () for seats without money
+    board: Tuple[int, ...]                     # community cards dealt
+    actions: Tuple[Tuple[int, int, str, int], ...]   # engine.history entries
+    awards: Tuple[Tuple[int, int], ...]
+
+    @classmethod
+    def from_engine(cls, engine: PokerEngine) -> "HandRecord":
+        """Capture the hand the engine has just finished."""
+        stacks = tuple(engine.starting_stacks)
+        holes = tuple(tuple(p.cards) if stacks[i] > 0 else () for i, p in enumerate(engine.players))
+        board = tuple(engine.tableCards[:BOARD_SIZES[engine.street]])
+        return cls(stacks, holes, board, tuple(engine.history), tuple(engine.awards))
+
+
+def write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def pack_cards(cards: List[int]) -> bytes:
+    """Card codes packed at 6 bits each."""
+    value = 0
+    for i, card in enumerate(cards):
+        value |= card << (CARD_BITS * i)
+    return value.to_bytes((CARD_BITS * len(cards) + 7) // 8, "little")
+
+
+def encode_hand(record: HandRecord) -> bytes:
+    """The length-prefixed bytes of one record."""
+    body = bytearray()
+    first = record.stacks[0]
+    write_varint(body, first)
+    differ = [seat for seat in range(1, len(record.stacks)) if record.stacks[seat] != first]
+    body.append(sum(1 << seat for seat in differ))
+    for seat in differ:
+        write_varint(body, record.stacks[seat])
+    body.append(len(record.board))
+    cards = [c for hole in record.holes for c in hole] + list(record.board)
+    body += pack_cards(cards)
+    write_varint(body, len(record.actions))
+    for street, seat, action, paid in record.actions:
+        body.append(street << 5 | seat << 2 | _ACTION_CODES[action])
+        if action == RAISE:
+            write_varint(body, paid)
+    body.append(len(record.awards))
+    for seat, amount in record.awards:
+        body.append(seat)
+        write_varint(body, amount)
+    out = bytearray()
+    write_varint(out, len(body))
+    return bytes(out + body)
+
+
+class HandHistoryWriter:
+    """Appends hands to a history file through a buffer; use as a context manager."""
+
+    def __init__(self, path: str, flush_bytes: int = FLUSH_BYTES, flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_seconds = flush_seconds
+        self.hands = 0
+        self._buffer = bytearray()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._buffer += _HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION)
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "HandHistoryWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record: HandRecord):
+        self.write_encoded(encode_hand(record), 1)
+
+    def write_engine(self, engine: PokerEngine):
+        """Record the hand ``engine`` has just finished."""
+        self.write(HandRecord.from_engine(engine))
+
+    def write_encoded(self, data: bytes, hands: int):
+        """Append ``hands`` records that were already encoded (e.g. by a worker process)."""
+        self._buffer += data
+        self.hands += hands
+        if len(self._buffer) >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def default_history_path() -> Optional[str]:
+    """History file named by $POKER_HISTORY, or None to record nothing."""
+    return os.environ.get("POKER_HISTORY") or None
+
+
+class ReplayError(ValueError):
+    """A recorded hand does not play out the same way through the engine."""
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    """Decode a varint at ``pos``; returns (value, position after it)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def unpack_cards(data, pos: int, count: int) -> Tuple[List[int], int]:
+    end = pos + (CARD_BITS * count + 7) // 8
+    value = int.from_bytes(data[pos:end], "little")
+    mask = (1 << CARD_BITS) - 1
+    return [(value >> (CARD_BITS * i)) & mask for i in range(count)], end
+
+
+def decode_hand(data, pos: int = 0) -> HandRecord:
+    """Decode one record body (without its length prefix) starting at ``pos``."""
+    first, pos = read_varint(data, pos)
+    differ = data[pos]
+    pos += 1
+    stacks = [first] * NUM_SEATS
+    for seat in range(1, NUM_SEATS):
+        if differ & (1 << seat):
+            stacks[seat], pos = read_varint(data, pos)
+    board_size = data[pos]
+    pos += 1
+    dealt = [seat for seat in range(NUM_SEATS) if stacks[seat] > 0]
+    cards, pos = unpack_cards(data, pos, 2 * len(dealt) + board_size)
+    holes = [()] * NUM_SEATS
+    for k, seat in enumerate(dealt):
+        holes[seat] = (cards[2 * k], cards[2 * k + 1])
+    board = tuple(cards[2 * len(dealt):])
+
+    # Calls and all-ins are not stored with amounts; follow the bet to recover them.
+    count, pos = read_varint(data, pos)
+    money = list(stacks)
+    actions = []
+    street = bet_on = 0
+    for _ in range(count):
+        byte = data[pos]
+        pos += 1
+        if byte >> 5 != street:
+            street, bet_on = byte >> 5, 0
+        seat, action = (byte >> 2) & 0x7, ACTIONS[byte & 0x3]
+        paid = 0
+        if action == RAISE:
+            paid, pos = read_varint(data, pos)
+            bet_on += paid
+        elif action == CHECK_CALL:
+            paid = min(bet_on, money[seat])
+        elif action == ALL_IN:
+            paid = money[seat]
+            bet_on = max(bet_on, paid)
+        money[seat] -= paid
+        actions.append((street, seat, action, paid))
+
+    awards = []
+    count = data[pos]
+    pos += 1
+    for _ in range(count):
+        seat = data[pos]
+        amount, pos = read_varint(data, pos + 1)
+        awards.append((seat, amount))
+    return HandRecord(tuple(stacks), tuple(holes), board, tuple(actions), tuple(awards))
+
+
+def _check_header(f, path: str):
+    magic, version = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != HISTORY_MAGIC or version != HISTORY_VERSION:
+        raise ValueError("%s is not a version %d hand history" % (path, HISTORY_VERSION))
+
+
+def scan_hands(path: str, offset: Optional[int] = None) -> Iterator[Tuple[int, HandRecord]]:
+    """Yield (file offset, record) for every hand in a history file, lazily.
+    ``offset`` (a record offset seen before) skips the hands in front of it."""
+    with open(path, "rb") as f:
+        _check_header(f, path)
+        base = offset if offset is not None else _HEADER.size  # file offset of buf[0]
+        f.seek(base)
+        buf = bytearray()
+        pos = 0
+        while True:
+            end = -1
+            try:
+                length, start = read_varint(buf, pos)
+                end = start + length
+            except IndexError:
+                pass
+            if end < 0 or end > len(buf):
+                block = f.read(READ_BLOCK)
+                if not block:
+                    if pos < len(buf):
+                        raise ValueError("%s ends in the middle of a hand" % path)
+                    return
+                del buf[:pos]
+                base += pos
+                pos = 0
+                buf += block
+                continue
+            yield base + pos, decode_hand(buf, start)
+            pos = end
+
+
+def read_hands(path: str) -> Iterator[HandRecord]:
+    """Every hand in a history file, decoded one at a time."""
+    for _, record in scan_hands(path):
+        yield record
+
+
+def read_hand_at(path: str, offset: int) -> HandRecord:
+    """The single hand whose record starts at ``offset``."""
+    with open(path, "rb") as f:
+        _check_header(f, path)
+        f.seek(offset)
+        head = f.read(10)
+        length, start = read_varint(head, 0)
+        body = head[start:start + length]
+        if len(body) < length:
+            body += f.read(length - len(body))
+    if len(body) < length:
+        raise ValueError("%s ends in the middle of a hand" % path)
+    return decode_hand(body)
+
+
+def replay_hand(record: HandRecord, engine: Optional[PokerEngine] = None) -> PokerEngine:
+    """Play a recorded hand again through the engine's betting rules.
+
+    Raises ReplayError if an action is out of turn, paid differs, or the hand
+    ends with other awards or stacks than the record implies.
+    """
+    engine = engine or PokerEngine()
+    for p, stack in zip(engine.players, record.stacks):
+        p.money = stack
+    engine.reset([c for hole in record.holes for c in hole] + list(record.board))
+    for street, seat, action, paid in record.actions:
+        if engine.is_terminal() or (engine.street, engine.current_player) != (street, seat):
+            raise ReplayError(f"{action} by seat {seat} on street {street} is out of turn")
+        engine.apply(action, engine.betOn + paid if action == RAISE else 0)
+        if engine.history[-1][3] != paid:
+            raise ReplayError(f"{action} by seat {seat} paid {engine.history[-1][3]}, recorded {paid}")
+    if not engine.is_terminal():
+        raise ReplayError("the recorded actions do not finish the hand")
+    if tuple(engine.awards) != tuple(record.awards):
+        raise ReplayError(f"awards {engine.awards} differ from recorded {list(record.awards)}")
+    expected = list(record.stacks)
+    for _, seat, _, paid in record.actions:
+        expected[seat] -= paid
+    for seat, amount in record.awards:
+        expected[seat] += amount
+    stacks = [p.money for p in engine.players]
+    if stacks != expected:
+        raise ReplayError(f"final stacks {stacks} differ from recorded {expected}")
+    return engine
+
+
+def main():
+    engine = PokerEngine()
+    hands = 0
+    for path in sys.argv[1:]:
+        for offset, record in scan_hands(path):
+            try:
+                replay_hand(record, engine)
+            except ReplayError as e:
+                raise ReplayError(f"{path} @ {offset}: {e}") from None
+            hands += 1
+    print(f"Replayed {hands} hands, all stacks match")
+
+
+if __name__ == '__main__':
+    main()
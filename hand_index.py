@@ -0,0 +1,253 @@
+"""On-disk inverted index over a binary hand history.
+
+Terms map to the sorted file offsets of the hands they occur in (offsets as
+yielded by ``hand_history.scan_hands``, so ``read_hand_at`` fetches a hit):
+
+    player:<name>                 the player was dealt in
+    hole:<class>                  someone held this preflop class ("AKs")
+    board:<texture>               rainbow / two-tone / monotone flop, paired,
+                                  flush-possible, connected
+    category:<name>               someone showed down this hand ("Flush")
+    won:<name> / lost:<name>      the player did or did not get chips back
+    hole:<name>:<class>           the player's own hole class
+    category:<name>:<category>    the player's own showdown hand
+
+Terms are lower-case. "All hands where Lisa had a flush and lost":
+
+    HandIndex("hands.idx").find(player="Lisa", category="Flush", result="lost")
+
+The index lives in a directory: ``index.json`` (how far the history has been
+indexed, seat names, segment list) plus immutable segment files, each a term
+table followed by one int64 postings array that is memory-mapped on open.
+``update_index`` only reads hands appended since the last run and adds them
+as a new segment; once there are more than ``MAX_SEGMENTS`` they are merged.
+"""
+
+import json
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cards import NUM_RANKS, card_rank, card_suit
+from hand_evaluator import evaluate7, hand_name
+from hand_history import HandRecord, scan_hands
+from poker_engine import FOLD, NUM_SEATS
+from preflop import class_name, hand_class
+
+INDEX_MAGIC = b"PKIX"
+INDEX_VERSION = 1
+MAX_SEGMENTS = 8
+MANIFEST = "index.json"
+
+_HEADER = struct.Struct("<4sII")
+_TERM = struct.Struct("<HQI")  # term length, first posting, posting count
+
+
+def default_names() -> List[str]:
+    """The engine's default seat names, used when a history was not given any."""
+    return [f"Player {i + 1}" for i in range(NUM_SEATS)]
+
+
+def board_textures(board: Sequence[int]) -> List[str]:
+    """Texture tags of a board with at least the flop."""
+    if len(board) < 3:
+        return []
+    flop_suits = len({card_suit(c) for c in board[:3]})
+    tags = [{1: "monotone", 2: "two-tone", 3: "rainbow"}[flop_suits]]
+    ranks = [card_rank(c) for c in board]
+    if len(set(ranks)) < len(ranks):
+        tags.append("paired")
+    if max(sum(1 for c in board if card_suit(c) == s) for s in range(4)) >= 3:
+        tags.append("flush-possible")
+    # Three distinct flop ranks inside one five-rank window: a straight is possible
+    flop = set(ranks[:3])
+    if NUM_RANKS - 1 in flop:
+        flop.add(-1)  # the ace also plays low
+    if any(len(flop & set(range(low, low + 5))) >= 3 for low in range(-1, NUM_RANKS - 4)):
+        tags.append("connected")
+    return tags
+
+
+def hand_terms(record: HandRecord, names: Sequence[str]) -> List[str]:
+    """Every term a recorded hand is indexed under."""
+    folded = {seat for _, seat, action, _ in record.actions if action == FOLD}
+    dealt = [seat for seat, hole in enumerate(record.holes) if hole]
+    live = [seat for seat in dealt if seat not in folded]
+    winners = {seat for seat, _ in record.awards}
+    showdown = len(live) > 1 and len(record.board) == 5
+    terms = {"board:" + tag for tag in board_textures(record.board)}
+    for seat in dealt:
+        name = names[seat].lower()
+        cls = class_name(hand_class(*record.holes[seat])).lower()
+        terms.update(("player:" + name, "hole:" + cls, f"hole:{name}:{cls}",
+                      ("won:" if seat in winners else "lost:") + name))
+        if showdown and seat in live:
+            category = hand_name(evaluate7(list(record.holes[seat]) + list(record.board))).lower()
+            terms.update(("category:" + category, f"category:{name}:{category}"))
+    return sorted(terms)
+
+
+def write_segment(path: str, postings: Dict[str, List[int]]):
+    """Write terms with their (sorted) offsets; atomically replaces ``path``."""
+    terms = sorted(postings)
+    table = bytearray(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(terms)))
+    start = 0
+    for term in terms:
+        encoded = term.encode("utf-8")
+        table += _TERM.pack(len(encoded), start, len(postings[term])) + encoded
+        start += len(postings[term])
+    table += b"\0" * (-len(table) % 8)  # align the postings for the memory map
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(table)
+        for term in terms:
+            f.write(np.asarray(postings[term], dtype="<i8").tobytes())
+    os.replace(tmp, path)
+
+
+class Segment:
+    """A read-only segment: term table in memory, postings memory-mapped."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            data = f.read(_HEADER.size)
+            magic, version, count = _HEADER.unpack(data)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError("%s is not a version %d index segment" % (path, INDEX_VERSION))
+            self.terms: Dict[str, Tuple[int, int]] = {}
+            pos = _HEADER.size
+            for _ in range(count):
+                length, start, n = _TERM.unpack(f.read(_TERM.size))
+                self.terms[f.read(length).decode("utf-8")] = (start, n)
+                pos += _TERM.size + length
+        pos += -pos % 8
+        total = sum(n for _, n in self.terms.values())
+        self.postings = np.memmap(path, dtype="<i8", mode="r", offset=pos, shape=(total,)) if total else \
+            np.empty(0, dtype=np.int64)
+
+    def lookup(self, term: str) -> np.ndarray:
+        start, n = self.terms.get(term, (0, 0))
+        return self.postings[start:start + n]
+
+
+class HandIndex:
+    """Queries over an index directory built by ``update_index``."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.segments = [Segment(os.path.join(index_dir, name)) for name in self.manifest["segments"]]
+
+    def lookup(self, term: str) -> np.ndarray:
+        """Sorted offsets of the hands indexed under ``term``."""
+        parts = [segment.lookup(term.lower()) for segment in self.segments]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, *terms: str) -> np.ndarray:
+        """Offsets of the hands that have all ``terms``."""
+        result = self.lookup(terms[0])
+        for term in terms[1:]:
+            result = np.intersect1d(result, self.lookup(term), assume_unique=True)
+        return result
+
+    def find(self, player: Optional[str] = None, hole: Optional[str] = None, board: Optional[str] = None,
+             category: Optional[str] = None, result: Optional[str] = None) -> np.ndarray:
+        """Search by fields; ``hole``, ``category`` and ``result`` ("won"/"lost")
+        apply to ``player`` when one is given."""
+        terms = ["board:" + board] if board else []
+        if player:
+            terms.append("player:" + player)
+            if hole:
+                terms.append(f"hole:{player}:{hole}")
+            if category:
+                terms.append(f"category:{player}:{category}")
+            if result:
+                terms.append(f"{result}:{player}")
+        else:
+            if hole:
+                terms.append("hole:" + hole)
+            if category:
+                terms.append("category:" + category)
+        if not terms:
+            raise ValueError("give at least one field to search by")
+        return self.search(*terms)
+
+    def terms(self) -> List[str]:
+        return sorted({term for segment in self.segments for term in segment.terms})
+
+
+def _read_manifest(index_dir: str, history_path: str, names: Optional[Sequence[str]]) -> dict:
+    path = os.path.join(index_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"history": os.path.abspath(history_path), "indexed_to": None, "hands": 0,
+            "names": list(names or default_names()), "segments": [], "next_segment": 0}
+
+
+def _write_manifest(index_dir: str, manifest: dict):
+    tmp = os.path.join(index_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(index_dir, MANIFEST))
+
+
+def _merge_segments(index_dir: str, manifest: dict):
+    merged: Dict[str, List[int]] = {}
+    for name in manifest["segments"]:
+        segment = Segment(os.path.join(index_dir, name))
+        for term in segment.terms:
+            merged.setdefault(term, []).extend(segment.lookup(term).tolist())
+        del segment
+    name = "seg-%06d.bin" % manifest["next_segment"]
+    manifest["next_segment"] += 1
+    write_segment(os.path.join(index_dir, name), merged)
+    old, manifest["segments"] = manifest["segments"], [name]
+    _write_manifest(index_dir, manifest)
+    for stale in old:
+        os.remove(os.path.join(index_dir, stale))
+
+
+def update_index(history_path: str, index_dir: str, names: Optional[Sequence[str]] = None) -> int:
+    """Index the hands appended to ``history_path`` since the last update.
+
+    ``names`` (seat names, as the history stores seats only) is remembered
+    from the first run. Returns the number of hands added.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest = _read_manifest(index_dir, history_path, names)
+    seat_names = manifest["names"]
+    postings: Dict[str, List[int]] = {}
+    added = 0
+    resume = manifest["indexed_to"]
+    for offset, record in scan_hands(history_path, resume):
+        if offset == resume:
+            continue  # the last hand indexed last time
+        for term in hand_terms(record, seat_names):
+            postings.setdefault(term, []).append(offset)
+        manifest["indexed_to"] = offset
+        added += 1
+    if not added:
+        return 0
+    name = "seg-%06d.bin" % manifest["next_segment"]
+    manifest["next_segment"] += 1
+    write_segment(os.path.join(index_dir, name), postings)
+    manifest["segments"].append(name)
+    manifest["hands"] += added
+    _write_manifest(index_dir, manifest)
+    if len(manifest["segments"]) > MAX_SEGMENTS:
+        _merge_segments(index_dir, manifest)
+    return added
+
+
+def main():
+    history_path, index_dir = sys.argv[1], sys.argv[2]
+    added = update_index(history_path, index_dir, sys.argv[3:] or None)
+    print(f"Indexed {added} new hands from {history_path}")
+
+
+if __name__ == '__main__':
+    main()
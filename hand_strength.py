@@ -0,0 +1,342 @@
+"""Hand strength for the AI: chance to beat one random hand, from tables and a cache.
+
+Strength is the equity (ties count half) of hole cards plus the visible board
+against a single random opponent hand:
+
+- preflop it comes straight from the preflop equity matrix (preflop.py),
+  averaged over every class an opponent can hold;
+- on the flop and turn it is looked up in ``hand_strength.bin`` (about
+  330 KB, next to this module) by hole class and board bucket. The bucket
+  describes how the board meets the hole cards: how many board cards pair
+  each hole rank, whether the rest of the board is paired, board ranks above
+  the high hole card, and flush and straight made hands, draws and threats.
+  ``build_table`` fills it offline from random deals played out to the river;
+- on the river, and for the rare flop or turn bucket the table has too few
+  deals for, it is computed exactly for the spot by ``postflop_strength``:
+  every opponent hand enumerated on the river, ``SAMPLES`` opponent hands
+  and runouts drawn from an RNG seeded by the spot before that.
+
+Exact results go into one LRU cache per street, keyed on the spot after
+sorting the cards and renaming suits in order of appearance, so isomorphic
+spots share an entry, and take precedence over the table. The caches hold at
+most ``max_bytes`` together; a table lookup takes tens of microseconds, a
+cache miss about 1 ms on the river and 2-3 ms on the flop and turn.
+
+    python hand_strength.py [deals_per_class]   # regenerate the table
+
+    strength = hand_strength(hole, board)
+    win_probability(strength, opponents=3)
+"""
+
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cards import NUM_CARDS, NUM_RANKS, NUM_SUITS, card_code, card_rank, card_suit
+from hand_evaluator import evaluate_batch
+from preflop import NUM_CLASSES, class_combos, hand_class, load_matrix
+
+# Opponent hands and runouts drawn for a flop or turn spot.
+SAMPLES = 2000
+# Default memory cap of a StrengthCache, and the size charged per entry
+# (key tuple, float, OrderedDict link).
+MAX_BYTES = 16 * 1024 * 1024
+ENTRY_BYTES = 240
+
+# Board sizes the table covers (flop, turn) and its buckets per hole class:
+# hole rank hits (9) x rest of board paired (3) x board ranks above (3)
+# x flush (4) x straight (3).
+TABLE_STREETS = (3, 4)
+NUM_BUCKETS = 9 * 3 * 3 * 4 * 3
+# Deals a table cell needs; below that the cell is left empty.
+MIN_DEALS = 100
+NO_DATA = 255
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_strength.bin")
+TABLE_MAGIC = b"PKHS"
+TABLE_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+_RANKS = np.arange(NUM_RANKS)
+
+Key = Tuple[int, ...]
+
+_preflop: Optional[np.ndarray] = None
+_table: Optional[np.ndarray] = None
+
+
+def preflop_strengths() -> np.ndarray:
+    """Strength of each of the 169 classes against a random hand."""
+    global _preflop
+    if _preflop is None:
+        weights = np.array([len(class_combos(c)) for c in range(NUM_CLASSES)], dtype=np.float64)
+        _preflop = load_matrix().astype(np.float64) @ weights / weights.sum()
+    return _preflop
+
+
+def canonical_key(hole: Sequence[int], board: Sequence[int]) -> Key:
+    """The spot with hole cards and board each sorted by rank and suits renamed
+    in order of first appearance; spots with the same key have the same strength."""
+    cards = sorted(hole, key=card_rank, reverse=True) + sorted(board, key=card_rank, reverse=True)
+    suits = [-1] * NUM_SUITS
+    renamed = 0
+    key = []
+    for c in cards:
+        suit = card_suit(c)
+        if suits[suit] < 0:
+            suits[suit] = renamed
+            renamed += 1
+        key.append(card_code(suits[suit], card_rank(c)))
+    return tuple(sorted(key[:2])) + tuple(sorted(key[2:]))
+
+
+def postflop_strength(hole: Sequence[int], board: Sequence[int], samples: int = SAMPLES) -> float:
+    """Equity against one random hand once the flop is out."""
+    known = list(hole) + list(board)
+    live = np.setdiff1d(np.arange(NUM_CARDS), known)
+    need = 5 - len(board)
+    if need == 0:
+        opponents = np.array([(a, b) for i, a in enumerate(live) for b in live[i + 1:]], dtype=np.intp)
+        runouts = np.empty((len(opponents), 0), dtype=np.intp)
+    else:
+        rng = np.random.default_rng(known)
+        picks = live[np.argsort(rng.random((samples, len(live))), axis=1)[:, :2 + need]]
+        opponents, runouts = picks[:, :2], picks[:, 2:]
+    n = len(opponents)
+    hands = np.empty((n, 7), dtype=np.intp)
+    hands[:, 2:2 + len(board)] = board
+    hands[:, 2 + len(board):] = runouts
+    hands[:, :2] = hole
+    ours = evaluate_batch(hands)
+    hands[:, :2] = opponents
+    theirs = evaluate_batch(hands)
+    return float(((ours > theirs).sum() + 0.5 * (ours == theirs).sum()) / n)
+
+
+def _counts(values: np.ndarray, size: int) -> np.ndarray:
+    """(N, size) occurrences of each value in every row of ``values``."""
+    counts = np.zeros((len(values), size), dtype=np.int8)
+    rows = np.arange(len(values))
+    for column in values.T:
+        counts[rows, column] += 1
+    return counts
+
+
+def _straight_windows(rank_counts: np.ndarray) -> np.ndarray:
+    """(N, 10) ranks present in each five-rank straight window, the wheel first."""
+    present = np.zeros((len(rank_counts), NUM_RANKS + 2), dtype=np.int8)
+    present[:, 1] = rank_counts[:, -1] > 0  # the ace plays low too
+    present[:, 2:] = rank_counts > 0
+    sums = present.cumsum(axis=1, dtype=np.int8)
+    return sums[:, 5:] - sums[:, :-5]
+
+
+def board_buckets(holes: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    """Table bucket of each spot: (N, 2) hole cards and (N, 3..5) boards in, (N,) ints out."""
+    holes = np.asarray(holes, dtype=np.intp)
+    boards = np.asarray(boards, dtype=np.intp)
+    rows = np.arange(len(holes))
+    river = boards.shape[1] == 5
+    hole_ranks = holes % NUM_RANKS
+    high, low = hole_ranks.max(axis=1), hole_ranks.min(axis=1)
+    rank_counts = _counts(boards % NUM_RANKS, NUM_RANKS)
+    # Board cards pairing each hole rank (for a pocket pair both count the same)
+    hits = np.minimum(rank_counts[rows, high], 2) * 3 + np.minimum(rank_counts[rows, low], 2)
+    others = rank_counts.copy()
+    others[rows, high] = 0
+    others[rows, low] = 0
+    paired = np.minimum((others >= 2).sum(axis=1) + (others >= 3).any(axis=1), 2)
+    above = np.minimum(((rank_counts > 0) & (_RANKS > high[:, None])).sum(axis=1), 2)
+
+    board_suits = _counts(boards // NUM_RANKS, NUM_SUITS)
+    hole_suits = _counts(holes // NUM_RANKS, NUM_SUITS)
+    ours = (board_suits + hole_suits) * (hole_suits > 0)
+    flush = np.select([(ours >= 5).any(axis=1), (ours == 4).any(axis=1) & (not river),
+                       ((board_suits >= 3) & (hole_suits == 0)).any(axis=1)], [2, 1, 3], 0)
+
+    with_hole = _straight_windows(rank_counts + _counts(hole_ranks, NUM_RANKS))
+    board_only = _straight_windows(rank_counts)
+    straight = np.select([((with_hole == 5) & (board_only < 5)).any(axis=1),
+                          ((with_hole == 4) & (board_only < 4)).any(axis=1) & (not river)], [2, 1], 0)
+    return (((hits * 3 + paired) * 3 + above) * 4 + flush) * 3 + straight
+
+
+def _straight_window_counts(ranks: Sequence[int]) -> List[int]:
+    """``_straight_windows`` of one list of ranks."""
+    mask = 0
+    for r in ranks:
+        mask |= 1 << (r + 1)
+    if mask & (1 << NUM_RANKS):
+        mask |= 1  # the ace plays low too
+    return [bin(mask >> low & 0x1F).count("1") for low in range(NUM_RANKS - 3)]
+
+
+def board_bucket(hole: Sequence[int], board: Sequence[int]) -> int:
+    """``board_buckets`` of a single spot, without the NumPy overhead."""
+    river = len(board) == 5
+    hole_ranks = [card_rank(c) for c in hole]
+    board_ranks = [card_rank(c) for c in board]
+    high, low = max(hole_ranks), min(hole_ranks)
+    rank_counts = [0] * NUM_RANKS
+    for r in board_ranks:
+        rank_counts[r] += 1
+    hits = min(rank_counts[high], 2) * 3 + min(rank_counts[low], 2)
+    others = [n for r, n in enumerate(rank_counts) if r != high and r != low]
+    paired = min(sum(n >= 2 for n in others) + any(n >= 3 for n in others), 2)
+    above = min(sum(1 for r in range(high + 1, NUM_RANKS) if rank_counts[r]), 2)
+
+    board_suits = [0] * NUM_SUITS
+    for c in board:
+        board_suits[card_suit(c)] += 1
+    hole_suits = [0] * NUM_SUITS
+    for c in hole:
+        hole_suits[card_suit(c)] += 1
+    ours = [b + h for b, h in zip(board_suits, hole_suits) if h]
+    if any(n >= 5 for n in ours):
+        flush = 2
+    elif 4 in ours and not river:
+        flush = 1
+    elif any(b >= 3 and not h for b, h in zip(board_suits, hole_suits)):
+        flush = 3
+    else:
+        flush = 0
+
+    with_hole = _straight_window_counts(board_ranks + hole_ranks)
+    board_only = _straight_window_counts(board_ranks)
+    if any(a == 5 and b < 5 for a, b in zip(with_hole, board_only)):
+        straight = 2
+    elif not river and any(a == 4 and b < 4 for a, b in zip(with_hole, board_only)):
+        straight = 1
+    else:
+        straight = 0
+    return (((hits * 3 + paired) * 3 + above) * 4 + flush) * 3 + straight
+
+
+def build_table(deals: int = 300000, seed: int = 0) -> np.ndarray:
+    """Mean strength per street, class and bucket as bytes (strength * 254),
+    ``NO_DATA`` where fewer than ``MIN_DEALS`` deals fell; shape
+    (len(TABLE_STREETS), 169, NUM_BUCKETS). Every class gets ``deals`` random
+    boards and opponent hands, played out to the river once."""
+    rng = np.random.default_rng(seed)
+    shape = (len(TABLE_STREETS), NUM_CLASSES, NUM_BUCKETS)
+    totals, counts = np.zeros(shape), np.zeros(shape)
+    rows = np.arange(deals)[:, None]
+    for cls in range(NUM_CLASSES):
+        combos = np.array(class_combos(cls))
+        holes = combos[rng.integers(0, len(combos), deals)]
+        order = rng.random((deals, NUM_CARDS))
+        order[rows, holes] = 2.0  # hole cards sort last
+        rest = np.argpartition(order, 7, axis=1)[:, :7]
+        board, opponents = rest[:, :5], rest[:, 5:]
+        ours = evaluate_batch(np.concatenate([holes, board], axis=1))
+        theirs = evaluate_batch(np.concatenate([opponents, board], axis=1))
+        result = (ours > theirs) + 0.5 * (ours == theirs)
+        for street, size in enumerate(TABLE_STREETS):
+            buckets = board_buckets(holes, board[:, :size])
+            totals[street, cls] += np.bincount(buckets, result, NUM_BUCKETS)
+            counts[street, cls] += np.bincount(buckets, minlength=NUM_BUCKETS)
+    table = np.round(254 * totals / np.maximum(counts, 1)).astype(np.uint8)
+    table[counts < MIN_DEALS] = NO_DATA
+    return table
+
+
+def write_table(table: np.ndarray, path: str = TABLE_PATH):
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, NUM_BUCKETS))
+        f.write(np.ascontiguousarray(table, dtype=np.uint8).tobytes())
+
+
+def load_table(path: str = TABLE_PATH) -> np.ndarray:
+    """Read a table written by ``write_table``."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, buckets = _HEADER.unpack_from(data, 0)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION or buckets != NUM_BUCKETS:
+        raise ValueError("%s is not a version %d hand strength table" % (path, TABLE_VERSION))
+    table = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size)
+    return table.reshape(len(TABLE_STREETS), NUM_CLASSES, NUM_BUCKETS)
+
+
+def default_table() -> np.ndarray:
+    """The table shipped in ``hand_strength.bin``, loaded once."""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+class StrengthCache:
+    """Flop and turn strengths from the table, exact ones (``postflop_strength``)
+    from per-street LRU caches under one memory cap. Safe to share between threads."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES, table: Optional[np.ndarray] = None):
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.streets: Dict[int, "OrderedDict[Key, float]"] = {3: OrderedDict(), 4: OrderedDict(), 5: OrderedDict()}
+        self.table = table  # None: the shipped table
+        self.hits = 0
+        self.table_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.streets.values())
+
+    def strength(self, hole: Sequence[int], board: Sequence[int]) -> float:
+        if not board:
+            return float(preflop_strengths()[hand_class(*hole)])
+        entries = self.streets[len(board)]
+        key = canonical_key(hole, board)
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if len(board) in TABLE_STREETS:
+            table = self.table if self.table is not None else default_table()
+            bucket = board_bucket(hole, board)
+            cell = table[TABLE_STREETS.index(len(board)), hand_class(*hole), bucket]
+            if cell != NO_DATA:
+                with self._lock:
+                    self.table_hits += 1
+                return cell / 254.0
+        # Compute on the canonical spot so every isomorphic spot gets the same number.
+        value = postflop_strength(key[:2], key[2:])
+        with self._lock:
+            self.misses += 1
+            entries[key] = value
+            if len(self) > self.max_entries:
+                self._evict()
+        return value
+
+    def _evict(self):
+        """Drop the least recently used entry of the street holding the most."""
+        max(self.streets.values(), key=len).popitem(last=False)
+
+
+_cache = StrengthCache()
+
+
+def hand_strength(hole: Sequence[int], board: Sequence[int] = ()) -> float:
+    """Strength (0..1) of ``hole`` with the visible ``board``, from the shared cache."""
+    return _cache.strength(hole, board)
+
+
+def win_probability(strength: float, opponents: int) -> float:
+    """Rough chance to beat every one of ``opponents`` random hands."""
+    return strength ** max(opponents, 1)
+
+
+def main():
+    deals = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    write_table(build_table(deals))
+    print(f"Wrote {TABLE_PATH} ({deals} deals per class)")
+
+
+if __name__ == '__main__':
+    main()
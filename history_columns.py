@@ -0,0 +1,143 @@
+"""Columnar export of binary hand histories to memory-mappable .npy files.
+
+``export_columns`` streams a history file (see hand_history.py) once and
+writes one .npy file per column into a directory:
+
+    hand_offset   int64 (H,)       record offset in the history file
+    hand_stacks   int32 (H, 6)     stacks when dealt
+    hand_hole     int8  (H, 6, 2)  hole card codes, -1 for seats not dealt in
+    hand_board    int8  (H, 5)     board card codes, -1 where not dealt
+    hand_won      int32 (H, 6)     chips awarded from the pot
+    action_hand   int64 (A,)       row in the hand_* columns
+    action_seat   int8  (A,)
+    action_street int8  (A,)
+    action_type   int8  (A,)       index into poker_engine.ACTIONS
+    action_amount int32 (A,)       chips put in by the action
+    action_pot    int64 (A,)       pot before the action
+
+Hands are numbered in file order, so ``hand_hole[action_hand, action_seat]``
+gives the cards behind every action. ``load_columns`` opens the files with
+``mmap_mode="r"``, so hundreds of millions of rows can be filtered with NumPy
+without reading them all into memory:
+
+    python history_columns.py hands.bin columns/
+"""
+
+import os
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from cards import NO_CARD
+from hand_history import scan_hands
+from poker_engine import ACTIONS, NUM_SEATS
+
+# Hands gathered in Python lists before a batch is appended to the files.
+BATCH_HANDS = 100000
+# Every .npy header is padded to this size so it can be rewritten in place.
+NPY_HEADER_SIZE = 128
+
+HAND_COLUMNS = {
+    "hand_offset": (np.int64, ()),
+    "hand_stacks": (np.int32, (NUM_SEATS,)),
+    "hand_hole": (np.int8, (NUM_SEATS, 2)),
+    "hand_board": (np.int8, (5,)),
+    "hand_won": (np.int32, (NUM_SEATS,)),
+}
+ACTION_COLUMNS = {
+    "action_hand": (np.int64, ()),
+    "action_seat": (np.int8, ()),
+    "action_street": (np.int8, ()),
+    "action_type": (np.int8, ()),
+    "action_amount": (np.int32, ()),
+    "action_pot": (np.int64, ()),
+}
+
+_ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+def _npy_header(dtype, shape: Tuple[int, ...]) -> bytes:
+    """A version 1.0 .npy header padded to exactly NPY_HEADER_SIZE bytes."""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (np.dtype(dtype).str, shape)
+    header = header.ljust(NPY_HEADER_SIZE - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class ColumnWriter:
+    """Appends rows to a .npy file whose final length is not known up front."""
+
+    def __init__(self, path: str, dtype, row_shape: Tuple[int, ...] = ()):
+        self.dtype = np.dtype(dtype)
+        self.row_shape = row_shape
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(_npy_header(self.dtype, (0,) + row_shape))
+
+    def append(self, values):
+        arr = np.asarray(values, dtype=self.dtype).reshape((-1,) + self.row_shape)
+        self._file.write(arr.tobytes())
+        self.rows += len(arr)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(_npy_header(self.dtype, (self.rows,) + self.row_shape))
+        self._file.close()
+
+
+def export_columns(history_path: str, out_dir: str) -> Tuple[int, int]:
+    """Write the columns of every hand in ``history_path``; returns (hands, actions)."""
+    os.makedirs(out_dir, exist_ok=True)
+    columns = {**HAND_COLUMNS, **ACTION_COLUMNS}
+    writers = {name: ColumnWriter(os.path.join(out_dir, name + ".npy"), dtype, shape)
+               for name, (dtype, shape) in columns.items()}
+    batch: Dict[str, List] = {name: [] for name in columns}
+    hands = 0
+
+    def flush():
+        for name, rows in batch.items():
+            if rows:
+                writers[name].append(rows)
+                rows.clear()
+
+    for offset, record in scan_hands(history_path):
+        batch["hand_offset"].append(offset)
+        batch["hand_stacks"].append(record.stacks)
+        batch["hand_hole"].append([hole or (NO_CARD, NO_CARD) for hole in record.holes])
+        batch["hand_board"].append(list(record.board) + [NO_CARD] * (5 - len(record.board)))
+        won = [0] * NUM_SEATS
+        for seat, amount in record.awards:
+            won[seat] += amount
+        batch["hand_won"].append(won)
+        pot = 0
+        for street, seat, action, paid in record.actions:
+            batch["action_hand"].append(hands)
+            batch["action_seat"].append(seat)
+            batch["action_street"].append(street)
+            batch["action_type"].append(_ACTION_CODES[action])
+            batch["action_amount"].append(paid)
+            batch["action_pot"].append(pot)
+            pot += paid
+        hands += 1
+        if hands % BATCH_HANDS == 0:
+            flush()
+    flush()
+    for writer in writers.values():
+        writer.close()
+    return hands, writers["action_hand"].rows
+
+
+def load_columns(out_dir: str) -> Dict[str, np.ndarray]:
+    """Memory-map every column written by ``export_columns``."""
+    return {name: np.load(os.path.join(out_dir, name + ".npy"), mmap_mode="r")
+            for name in list(HAND_COLUMNS) + list(ACTION_COLUMNS)}
+
+
+def main():
+    hands, actions = export_columns(sys.argv[1], sys.argv[2])
+    print(f"Exported {hands} hands, {actions} actions to {sys.argv[2]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Anytime Monte Carlo tree search bot over the headless betting rules.
+
+Every iteration deals a fresh guess of the unknown cards (opponents' hole
+cards uniformly from the unseen ones, then the rest of the board), rebuilds
+the hand in a scratch ``PokerEngine`` by replaying the observed actions, and
+walks down the tree: UCB1 picks among fold / check-call / raise / all-in at
+every betting node, a new node is added, and a quick random playout finishes
+the hand. Each seat's chip result goes back up the path, and every node is
+scored for the seat to act there.
+
+Nodes live in a transposition table keyed on a hash of the public betting
+state (street, seat to act, bet, pot, stacks, who is still in, who has acted,
+visible board), so lines that reach the same state share statistics and the
+tree built for one decision is reused by the next one in the same hand. The
+search stops at its wall-clock ``budget`` (or ``max_iterations``) and plays
+the most visited root action:
+
+    bot = MCTSBot(budget=0.2)
+    runner = BotRunner(bot, budget=0.5)
+"""
+
+import math
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bots import Action, Bot, Observation
+from cards import NUM_CARDS
+from poker_engine import ALL_IN, CHECK_CALL, FOLD, MIN_BET, RAISE, PokerEngine
+
+# UCB1 exploration constant; rewards are scaled to the chips in play.
+EXPLORATION = 1.4
+# Nodes kept before the transposition table is cleared.
+MAX_NODES = 200000
+
+
+class Node:
+    """Visit counts and summed rewards of each action tried at one state."""
+    __slots__ = ("visits", "stats")
+
+    def __init__(self):
+        self.visits = 0
+        self.stats: Dict[str, List[float]] = {}  # action -> [visits, total reward]
+
+
+def state_key(engine: PokerEngine) -> int:
+    """Hash of the public state of a hand in progress."""
+    players = engine.players
+    return hash((engine.street, engine.current_player, engine.betOn, engine.pot,
+                 tuple(p.money for p in players), tuple(p.round for p in players),
+                 tuple(p.goodToGo for p in players), tuple(engine.tableCards)))
+
+
+def tree_actions(engine: PokerEngine) -> List[str]:
+    """Actions searched at a node: the legal ones, without folding when checking is free."""
+    legal = engine.legal_actions()
+    if engine.betOn == 0:
+        return [a for a in legal if a != FOLD]
+    return legal
+
+
+def raise_amount(engine: PokerEngine) -> int:
+    """The one raise size searched: a pot-sized raise."""
+    return engine.betOn + max(engine.pot, MIN_BET)
+
+
+def _rollout_action(engine: PokerEngine, rng) -> Tuple[str, int]:
+    legal = engine.legal_actions()
+    r = rng.random()
+    if engine.betOn == 0:
+        return (RAISE, MIN_BET) if r < 0.2 else (CHECK_CALL, 0)
+    if r < 0.3:
+        return FOLD, 0
+    if r < 0.9 or RAISE not in legal:
+        return (CHECK_CALL if CHECK_CALL in legal else ALL_IN), 0
+    return RAISE, engine.betOn * 2
+
+
+class MCTSBot(Bot):
+    """Information-set style MCTS with sampled opponent cards and a time budget."""
+
+    name = "mcts"
+
+    def __init__(self, budget: float = 0.1, max_iterations: Optional[int] = None,
+                 max_nodes: int = MAX_NODES, rng=None):
+        self.budget = budget
+        self.max_iterations = max_iterations
+        self.max_nodes = max_nodes
+        self.rng = rng  # a RandomSource or random.Random; None: the global random module
+        self.table: Dict[int, Node] = {}
+        self.iterations = 0  # of the last decision
+        self._hand: Optional[Tuple] = None
+
+    def reseed(self, rng):
+        self.rng = rng
+
+    def _determinize(self, obs: Observation, starting: Sequence[int], rng) -> PokerEngine:
+        """A table at the observed decision, with the unknown cards guessed."""
+        seen = set(obs.hole) | set(obs.board)
+        unseen = [c for c in range(NUM_CARDS) if c not in seen]
+        # Partial Fisher-Yates: draw only as many unseen cards as are needed
+        order = []
+        drawn = 0
+        for seat, stack in enumerate(starting):
+            if stack <= 0:
+                continue
+            if seat == obs.seat:
+                order.extend(obs.hole)
+                continue
+            for _ in range(2):
+                j = drawn + int(rng.random() * (len(unseen) - drawn))
+                unseen[drawn], unseen[j] = unseen[j], unseen[drawn]
+                order.append(unseen[drawn])
+                drawn += 1
+        order.extend(obs.board)
+        for _ in range(5 - len(obs.board)):
+            j = drawn + int(rng.random() * (len(unseen) - drawn))
+            unseen[drawn], unseen[j] = unseen[j], unseen[drawn]
+            order.append(unseen[drawn])
+            drawn += 1
+        engine = PokerEngine()
+        for p, stack in zip(engine.players, starting):
+            p.money = stack
+        engine.reset(order)
+        for _, _, action, paid in obs.history:
+            engine.apply(action, engine.betOn + paid if action == RAISE else 0)
+        return engine
+
+    def _iterate(self, obs: Observation, starting: Sequence[int], scale: float, rng):
+        engine = self._determinize(obs, starting, rng)
+        path = []
+        expanded = False
+        while not engine.is_terminal():
+            key = state_key(engine)
+            node = self.table.get(key)
+            if node is None:
+                if expanded:
+                    break
+                node = self.table[key] = Node()
+                expanded = True
+            action = self._select(node, tree_actions(engine))
+            path.append((node, engine.current_player, action))
+            engine.apply(action, raise_amount(engine) if action == RAISE else 0)
+        while not engine.is_terminal():
+            engine.apply(*_rollout_action(engine, rng))
+        for node, seat, action in path:
+            reward = (engine.players[seat].money - starting[seat]) / scale
+            node.visits += 1
+            stat = node.stats[action]
+            stat[0] += 1
+            stat[1] += reward
+
+    @staticmethod
+    def _select(node: Node, actions: Sequence[str]) -> str:
+        """UCB1; actions not tried yet come first."""
+        best, best_score = actions[0], -math.inf
+        log_visits = math.log(node.visits + 1)
+        for action in actions:
+            stat = node.stats.get(action)
+            if stat is None:
+                node.stats[action] = [0, 0.0]
+                return action
+            if stat[0] == 0:
+                return action
+            score = stat[1] / stat[0] + EXPLORATION * math.sqrt(log_visits / stat[0])
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def act(self, obs: Observation) -> Action:
+        deadline = time.perf_counter() + self.budget
+        rng = self.rng or random
+        starting = list(obs.stacks)
+        for _, seat, _, paid in obs.history:
+            starting[seat] += paid
+        # A new hand (or a full table) starts a new tree
+        hand = (obs.hole, tuple(starting))
+        if hand != self._hand or len(self.table) > self.max_nodes:
+            self.table.clear()
+            self._hand = hand
+        scale = float(sum(starting))
+        self.iterations = 0
+        while time.perf_counter() < deadline and (self.max_iterations is None or
+                                                   self.iterations < self.max_iterations):
+            self._iterate(obs, starting, scale, rng)
+            self.iterations += 1
+
+        root = self._determinize(obs, starting, rng)
+        node = self.table.get(state_key(root))
+        actions = tree_actions(root)
+        if node is None or not node.stats:
+            return (CHECK_CALL if CHECK_CALL in actions else actions[0]), 0
+        action = max((a for a in actions if a in node.stats), key=lambda a: node.stats[a][0])
+        if action == RAISE:
+            low, high = obs.raise_bounds
+            return RAISE, min(max(raise_amount(root), low), high)
+        return action, 0
@@ -0,0 +1,108 @@
+"""Running player statistics, updated as the engine reports each action.
+
+``PlayerStats`` is an ``EngineListener``: attach it to a table and it keeps a
+handful of counters per player name, so stats cost O(1) memory per player
+and a ``snapshot`` is available at any moment, mid-session included.
+
+    stats = PlayerStats()
+    engine.listeners.append(stats)
+    ...
+    stats.snapshot()["Lisa"]["vpip"]
+
+Definitions (the button's blind is forced, so posting it alone counts for
+neither VPIP nor PFR):
+- VPIP: % of hands where the player put money in preflop
+- PFR: % of hands where the player bet or raised preflop
+- AF: postflop bets and raises divided by postflop calls
+- WTSD: % of the hands where the player saw the flop that reached showdown
+"""
+
+from typing import Dict, List
+
+from poker_engine import ALL_IN, CHECK_CALL, FLOP, FOLD, PREFLOP, RAISE, SHOWDOWN, EngineListener, PokerEngine
+
+
+class Counters:
+    __slots__ = ("hands", "vpip", "pfr", "aggressive", "calls", "saw_flop", "showdowns")
+
+    def __init__(self):
+        self.hands = 0
+        self.vpip = 0
+        self.pfr = 0
+        self.aggressive = 0   # postflop bets, raises and all-ins that raise
+        self.calls = 0        # postflop calls (checks excluded)
+        self.saw_flop = 0
+        self.showdowns = 0
+
+
+class PlayerStats(EngineListener):
+    """VPIP, PFR, aggression factor and WTSD per player name."""
+
+    def __init__(self):
+        self.players: Dict[str, Counters] = {}
+        # Flags for the hand in progress, per seat
+        self._dealt: List[bool] = []
+        self._vpip: List[bool] = []
+        self._pfr: List[bool] = []
+        self._folded_preflop: List[bool] = []
+        self._street = PREFLOP
+        self._bet = 0  # bet to match before the current action
+
+    def _counters(self, name: str) -> Counters:
+        counters = self.players.get(name)
+        if counters is None:
+            counters = self.players[name] = Counters()
+        return counters
+
+    def hand_started(self, engine: PokerEngine):
+        seats = len(engine.players)
+        self._dealt = [p.playing for p in engine.players]
+        self._vpip = [False] * seats
+        self._pfr = [False] * seats
+        self._folded_preflop = [False] * seats
+        self._street = PREFLOP
+        # The blind, if posted, is the bet to match; it is not an action of its own
+        self._bet = engine.betOn
+
+    def action(self, engine: PokerEngine, street: int, seat: int, action: str, paid: int):
+        if street != self._street:
+            self._street, self._bet = street, 0
+        raised = action == RAISE or (action == ALL_IN and paid > self._bet)
+        self._bet = engine.betOn
+        if street == PREFLOP:
+            if action == FOLD:
+                self._folded_preflop[seat] = True
+            self._vpip[seat] |= paid > 0
+            self._pfr[seat] |= raised
+            return
+        counters = self._counters(engine.players[seat].name)
+        if raised:
+            counters.aggressive += 1
+        elif paid > 0 and action in (CHECK_CALL, ALL_IN):
+            counters.calls += 1
+
+    def hand_finished(self, engine: PokerEngine):
+        reached_flop = engine.street >= FLOP
+        for seat, p in enumerate(engine.players):
+            if not self._dealt[seat]:
+                continue
+            counters = self._counters(p.name)
+            counters.hands += 1
+            counters.vpip += self._vpip[seat]
+            counters.pfr += self._pfr[seat]
+            if reached_flop and not self._folded_preflop[seat]:
+                counters.saw_flop += 1
+                counters.showdowns += engine.street == SHOWDOWN and p.round
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Current stats of every player seen so far (percentages; AF as a ratio)."""
+        result = {}
+        for name, c in self.players.items():
+            result[name] = {
+                "hands": c.hands,
+                "vpip": 100.0 * c.vpip / c.hands if c.hands else 0.0,
+                "pfr": 100.0 * c.pfr / c.hands if c.hands else 0.0,
+                "af": c.aggressive / c.calls if c.calls else float(c.aggressive),
+                "wtsd": 100.0 * c.showdowns / c.saw_flop if c.saw_flop else 0.0,
+            }
+        return result
@@ -0,0 +1,443 @@
+"""Headless Texas Hold'em engine: game state and betting rules, no display.
+
+The engine knows nothing about pygame, terminals or timing. A front end (or a
+simulator) drives it with a small loop:
+
+    engine.reset()
+    while not engine.is_terminal():
+        seat = engine.current_player
+        engine.apply(choose(engine.legal_actions()), amount)
+
+On every table there are six seats, calling pays the full current bet, and a
+raise names the new bet ("raise to") and reopens the action for everyone
+else. A hand ends when one player is left or after the river, where the best
+7-card hand takes the pot (split evenly on a tie, odd chips to the earliest
+seat).
+
+The engine has two separate modes for who opens the betting:
+
+- no blinds (the default, used by the GUI, the simulator, session logs and
+  hand histories): ``reset()`` without a button, and seat 0 acts first on
+  every street;
+- blind and button (the console game): ``PokerEngine(blind=...)`` and
+  ``reset(button=seat)``. The button posts the blind as the opening bet, and
+  the seat after the button acts first on every street. The blind is not an
+  action in ``history``, so hand histories and session logs do not cover
+  this mode.
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cards import NO_CARD, NUM_CARDS, card_rank
+from hand_evaluator import evaluate7
+from random_source import RandomSource
+
+NUM_SEATS = 6
+STARTING_MONEY = 1000
+MIN_BET = 10
+
+FOLD = "Fold"
+CHECK_CALL = "Check/Call"
+RAISE = "Raise"
+ALL_IN = "All-In"
+ACTIONS = (FOLD, CHECK_CALL, RAISE, ALL_IN)
+
+PREFLOP, FLOP, TURN, RIVER, SHOWDOWN = range(5)
+STREET_NAMES = ["Preflop", "Flop", "Turn", "River", "Showdown"]
+# Community cards visible on each street.
+BOARD_SIZES = [0, 3, 4, 5, 5]
+
+
+_NEW_DECK = tuple(range(NUM_CARDS))
+
+
+class Deck:
+    """52 card codes (see cards.py) in one list that is never reallocated.
+
+    Cards are drawn by partial Fisher-Yates: ``hitme`` swaps a random card of
+    the undealt part to position ``top``, so a hand costs one random number per
+    card dealt instead of a full shuffle, and ``cards[:top]`` is the order the
+    cards came out in. ``reset(dead)`` keeps known cards out of the draw and a
+    ``rng`` (a ``RandomSource``, or an int to seed one) makes the deals
+    reproducible; without it the global ``random`` module is used.
+    """
+
+    def __init__(self, rng=None):
+        self.suits = ["♦", "♠", "♥", "♣"]
+        self.ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+        self.cards: List[int] = list(_NEW_DECK)
+        self.top = 0
+        self.live = NUM_CARDS  # cards[live:] are dead
+        self.fixed = 0         # cards[:fixed] come out in the order given to arrange()
+        self.rng = RandomSource(rng) if isinstance(rng, int) else rng or random
+
+    def reset(self, dead: Sequence[int] = ()):
+        """Put every card back except ``dead`` ones (cards known to be out)."""
+        cards = self.cards
+        cards[:] = _NEW_DECK  # same order every hand: a seeded deal depends on the seed only
+        self.top = 0
+        self.fixed = 0
+        self.live = NUM_CARDS
+        for c in dead:
+            i = cards.index(c)
+            if i < self.live:
+                self.live -= 1
+                cards[i], cards[self.live] = cards[self.live], c
+
+    def arrange(self, order: Sequence[int]):
+        """Stack the deck: ``order`` comes off the top first, the rest is drawn at random."""
+        self.reset()
+        cards = self.cards
+        for k, c in enumerate(order):
+            i = cards.index(c)
+            cards[i], cards[k] = cards[k], c
+        self.fixed = len(order)
+
+    def hitme(self) -> int:
+        top = self.top
+        if top >= self.live:
+            raise IndexError("no cards left in the deck")
+        cards = self.cards
+        if top >= self.fixed:
+            j = top + int(self.rng.random() * (self.live - top))
+            cards[top], cards[j] = cards[j], cards[top]
+        self.top = top + 1
+        return cards[top]
+
+
+class EngineListener:
+    """Receives a table's events as they happen; override the ones you need."""
+
+    def hand_started(self, engine: "PokerEngine"):
+        pass
+
+    def action(self, engine: "PokerEngine", street: int, seat: int, action: str, paid: int):
+        pass
+
+    def hand_finished(self, engine: "PokerEngine"):
+        pass
+
+
+class Player:
+    __slots__ = ("name", "money", "cards", "playing", "round", "is_ai", "goodToGo",
+                 "last_action", "bet_this_round")
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.money = 0
+        self.cards = [NO_CARD, NO_CARD]
+        self.playing = True
+        self.round = True
+        self.is_ai = True
+        self.goodToGo = False
+        self.last_action = ""  # Track last action for display
+        self.bet_this_round = 0  # Track how much bet in current betting round
+
+
+class PokerEngine:
+    """State of one table and the rules that move it forward.
+
+    ``starting_stacks`` holds every seat's money when the current hand was
+    dealt, ``history`` lists the hand's actions as (street, seat, action, paid)
+    and ``awards`` the (seat, amount) pot payouts once the hand is over.
+    Every ``EngineListener`` in ``listeners`` is told about each hand and action.
+    ``rng`` is passed on to the ``Deck``. The blind the button posts is not an
+    action: it is in ``pot`` but not in ``history``.
+    """
+
+    def __init__(self, names: Optional[List[str]] = None, money: int = STARTING_MONEY, rng=None,
+                 blind: int = 0):
+        self.players = [Player() for _ in range(NUM_SEATS)]
+        for i, p in enumerate(self.players):
+            p.name = names[i] if names else f"Player {i + 1}"
+            p.money = money
+        self.deck = Deck(rng)
+        self.tableCards = [NO_CARD] * 5
+        self.pot = 0
+        self.betOn = 0  # Current bet amount that players need to match
+        self.street = SHOWDOWN
+        self.current_player = -1
+        self.hand_over = True
+        self.blind = blind
+        self.button = -1  # no button: seat 0 acts first
+        self.starting_stacks = [money] * NUM_SEATS
+        self.history: List[Tuple[int, int, str, int]] = []
+        self.awards: List[Tuple[int, int]] = []
+        self.showdown_scores: Dict[int, int] = {}
+        self.listeners: List[EngineListener] = []
+
+    def players_with_money(self) -> int:
+        return sum(1 for p in self.players if p.money > 0)
+
+    def get_state(self) -> dict:
+        """Everything needed to rebuild the table, as plain lists and numbers
+        (JSON-friendly); listeners are not part of the state."""
+        return {
+            "players": [{field: getattr(p, field) for field in Player.__slots__} for p in self.players],
+            "deck": {"cards": list(self.deck.cards), "top": self.deck.top},
+            "tableCards": list(self.tableCards),
+            "pot": self.pot,
+            "betOn": self.betOn,
+            "street": self.street,
+            "current_player": self.current_player,
+            "hand_over": self.hand_over,
+            "button": self.button,
+            "starting_stacks": list(self.starting_stacks),
+            "history": [list(entry) for entry in self.history],
+            "awards": [list(entry) for entry in self.awards],
+            "showdown_scores": [[seat, score] for seat, score in self.showdown_scores.items()],
+        }
+
+    def set_state(self, state: dict):
+        """Restore what ``get_state`` returned."""
+        for p, fields in zip(self.players, state["players"]):
+            for field in Player.__slots__:
+                setattr(p, field, fields[field])
+            p.cards = list(p.cards)
+        self.deck.cards[:] = state["deck"]["cards"]
+        self.deck.top = state["deck"]["top"]
+        self.tableCards[:] = state["tableCards"]
+        self.pot = state["pot"]
+        self.betOn = state["betOn"]
+        self.street = state["street"]
+        self.current_player = state["current_player"]
+        self.hand_over = state["hand_over"]
+        self.button = state.get("button", -1)
+        self.starting_stacks = list(state["starting_stacks"])
+        self.history = [tuple(entry) for entry in state["history"]]
+        self.awards = [tuple(entry) for entry in state["awards"]]
+        self.showdown_scores = {seat: score for seat, score in state["showdown_scores"]}
+
+    def reset(self, deck_order: Optional[List[int]] = None, button: int = -1):
+        """Start a new hand: shuffle, deal everyone with money in, open preflop betting.
+        ``deck_order`` deals a prearranged deck instead (hole cards in seat order,
+        then the board), e.g. to replay a recorded hand. ``button`` is the seat
+        that posts the blind and acts last; -1 has seat 0 act first."""
+        if self.players_with_money() < 2:
+            raise ValueError("a hand needs at least two players with money")
+        for p in self.players:
+            p.round = p.money > 0
+            p.playing = p.money > 0
+            p.goodToGo = False
+            p.last_action = ""
+        self.pot = 0
+        self.betOn = 0
+        self.starting_stacks = [p.money for p in self.players]
+        self.history = []
+        self.awards = []
+        self.showdown_scores = {}
+        self.deal(deck_order)
+        self.street = PREFLOP
+        self.hand_over = False
+        self.current_player = -1
+        self.button = button
+        if button >= 0:
+            self._post_blind(self.players[button])
+        # Listeners see the posted blind in ``pot`` and ``betOn``
+        for listener in self.listeners:
+            listener.hand_started(self)
+        self._next_to_act(button + 1)
+
+    def _post_blind(self, p: Player):
+        """The button opens the betting with the blind, if it can pay all of it."""
+        if not self.blind or not p.playing or p.money < self.blind:
+            return
+        p.money -= self.blind
+        p.last_action = f"Blind ${self.blind}"
+        p.goodToGo = True
+        self.pot += self.blind
+        self.betOn = self.blind
+
+    def deal(self, deck_order: Optional[List[int]] = None):
+        if deck_order is None:
+            self.deck.reset()
+        else:
+            self.deck.arrange(deck_order)
+        for p in self.players:
+            if p.playing:
+                p.cards[0] = self.deck.hitme()
+                p.cards[1] = self.deck.hitme()
+        # The board is drawn now and turned over street by street, so the whole
+        # hand is fixed by deck.cards[:deck.top] (what the session log records).
+        for i in range(5):
+            self.deck.hitme()
+            self.tableCards[i] = NO_CARD
+
+    def is_terminal(self) -> bool:
+        return self.hand_over
+
+    def legal_actions(self) -> List[str]:
+        """Actions open to the player to act, in button order."""
+        if self.hand_over:
+            return []
+        p = self.players[self.current_player]
+        if self.betOn > 0:
+            if p.money > self.betOn:
+                return [FOLD, CHECK_CALL, RAISE, ALL_IN]
+            if p.money >= self.betOn:
+                return [FOLD, CHECK_CALL, ALL_IN]
+            return [FOLD, ALL_IN]
+        return [FOLD, CHECK_CALL, RAISE, ALL_IN]
+
+    def raise_bounds(self) -> Tuple[int, int]:
+        """Smallest and largest total bet the player to act may raise to."""
+        p = self.players[self.current_player]
+        max_to = self.betOn + p.money
+        min_to = self.betOn + MIN_BET if self.betOn > 0 else MIN_BET
+        return min(min_to, max_to), max_to
+
+    def apply(self, action: str, amount: int = 0):
+        """Play ``action`` for the current player. ``amount`` is the raise-to total
+        for RAISE (clamped to ``raise_bounds``) and ignored otherwise."""
+        if action not in self.legal_actions():
+            raise ValueError(f"{action!r} is not legal now; expected one of {self.legal_actions()}")
+        seat = self.current_player
+        p = self.players[seat]
+        paid = 0
+        if action == FOLD:
+            p.round = False
+            p.last_action = "Fold"
+        elif action == CHECK_CALL:
+            if self.betOn > 0:
+                paid = min(self.betOn, p.money)
+                p.last_action = f"Call ${paid}"
+            else:
+                p.last_action = "Check"
+            p.goodToGo = True
+        elif action == RAISE:
+            min_to, max_to = self.raise_bounds()
+            raise_to = min(max(amount, min_to), max_to)
+            paid = raise_to - self.betOn
+            p.last_action = f"Raise ${raise_to}" if self.betOn > 0 else f"Bet ${raise_to}"
+            self.betOn = raise_to
+            self._reopen(seat)
+        else:
+            paid = p.money
+            p.last_action = f"All-in ${paid}"
+            if paid > self.betOn:
+                self.betOn = paid
+                self._reopen(seat)
+            p.goodToGo = True
+        p.money -= paid
+        self.pot += paid
+        self.history.append((self.street, seat, action, paid))
+        for listener in self.listeners:
+            listener.action(self, self.street, seat, action, paid)
+        self._advance(seat)
+
+    def _reopen(self, seat: int):
+        for i, other in enumerate(self.players):
+            other.goodToGo = i == seat
+
+    def _advance(self, seat: int):
+        if sum(1 for p in self.players if p.round) == 1:
+            self._finish([i for i, p in enumerate(self.players) if p.round])
+        elif not self._next_to_act(seat + 1):
+            self._next_street()
+
+    def _next_to_act(self, start: int) -> bool:
+        """Find the next seat (from ``start``, wrapping) that still owes an action."""
+        for k in range(NUM_SEATS):
+            idx = (start + k) % NUM_SEATS
+            p = self.players[idx]
+            if not p.round or not p.playing or p.goodToGo:
+                continue
+            # Players who are all-in (no money left) have nothing to decide
+            if p.money <= 0:
+                p.goodToGo = True
+                continue
+            self.current_player = idx
+            return True
+        return False
+
+    def _next_street(self):
+        while True:
+            self.street += 1
+            self.betOn = 0
+            for p in self.players:
+                p.goodToGo = False
+            if self.street == SHOWDOWN:
+                self._showdown()
+                return
+            board = self.deck.top - 5
+            for i in range(BOARD_SIZES[self.street - 1], BOARD_SIZES[self.street]):
+                self.tableCards[i] = self.deck.cards[board + i]
+            if self._next_to_act(self.button + 1):
+                return
+
+    def evaluate_best_hand(self, player_idx: int) -> int:
+        """Score of the player's best 5 of 7 cards, or 0 if the player has folded."""
+        if not self.players[player_idx].round:
+            return 0
+        return evaluate7(self.players[player_idx].cards + self.tableCards)
+
+    def _showdown(self):
+        active = [i for i, p in enumerate(self.players) if p.round]
+        self.showdown_scores = {i: self.evaluate_best_hand(i) for i in active}
+        best = max(self.showdown_scores.values())
+        self._finish([i for i in active if self.showdown_scores[i] == best])
+
+    def _finish(self, winners: List[int]):
+        share, odd = divmod(self.pot, len(winners))
+        self.awards = [(seat, share + (1 if k < odd else 0)) for k, seat in enumerate(winners)]
+        for seat, amount in self.awards:
+            self.players[seat].money += amount
+        self.current_player = -1
+        self.hand_over = True
+        for listener in self.listeners:
+            listener.hand_finished(self)
+
+
+def heuristic_action(engine: PokerEngine, rng=random) -> Tuple[str, int]:
+    """The original table AI: judge the hole cards, add some randomness.
+    Returns (action, raise-to amount) for the player to act."""
+    p = engine.players[engine.current_player]
+    return heuristic_decision(p.cards, p.money, engine.betOn, rng)
+
+
+def heuristic_decision(cards, money: int, bet_on: int, rng=random) -> Tuple[str, int]:
+    """``heuristic_action`` from the bare facts it uses: hole cards, stack and bet to match."""
+    bet_amount = MIN_BET
+    can_call = money >= bet_on
+    can_raise = money > bet_on
+    # A short stack "calls" by going all-in
+    call = CHECK_CALL if can_call else ALL_IN
+
+    rank0 = card_rank(cards[0])
+    rank1 = card_rank(cards[1])
+    high_card = max(rank0, rank1)
+    pair = rank0 == rank1
+
+    action_choice = rng.random()
+
+    if high_card < 8 and not pair:
+        # Weak hand - mostly fold or check
+        if bet_on > bet_amount:
+            return FOLD, 0
+        if bet_on > 0:
+            if action_choice < 0.3 and can_call:
+                return CHECK_CALL, 0
+            return FOLD, 0
+        return CHECK_CALL, 0
+    if high_card >= 10 or pair:
+        # Strong hand - call or raise
+        if bet_on > 0:
+            if action_choice < 0.6 and can_call:
+                return CHECK_CALL, 0
+            if can_raise and action_choice < 0.85:
+                min_raise = bet_on * 2
+                max_raise = min(money, bet_on * 3)
+                raise_to = rng.randint(min_raise, max_raise) if max_raise > min_raise else min_raise
+                return RAISE, raise_to
+            return call, 0
+        # No bet yet - bet or check
+        if action_choice < 0.5:
+            return RAISE, rng.randint(bet_amount, bet_amount * 3)
+        return CHECK_CALL, 0
+    # Medium hand
+    if bet_on > 0:
+        if action_choice < 0.7 and can_call:
+            return CHECK_CALL, 0
+        return FOLD, 0
+    return CHECK_CALL, 0
@@ -1,86 +1,99 @@
-import random
+import os
 import time
 import pygame
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+from bots import BotRunner, EquityBot, PushFoldBot
+from cards import NUM_CARDS, card_rank, card_suit
+from equity import calculate_equity, exact_equity
+from hand_evaluator import evaluate5, hand_name
+from hand_history import HandHistoryWriter, default_history_path
+from player_stats import PlayerStats
+from session_log import SessionLog
+from poker_engine import (BOARD_SIZES, CHECK_CALL, FOLD, NUM_SEATS, RAISE, RIVER, SHOWDOWN, STARTING_MONEY,
+                          STREET_NAMES, Deck, Player, PokerEngine)
 from poker_gui import PokerGUI
+from random_source import RandomSource, default_seed
 # from poker_gui_old import PokerGUI
 
-
-class Card:
-    def __init__(self, suit: int = 0, rank: int = 0):
-        self.suit = suit
-        self.rank = rank
-
-
-class Deck:
-    def __init__(self):
-        self.suits = ["♦", "♠", "♥", "♣"]
-        self.ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
-        self.cards: List[Card] = []
-        self.top = 0
-        self.reset()
-
-    def reset(self):
-        self.cards = [Card(s, r) for s in range(4) for r in range(13)]
-        self.top = 0
-
-    def shuffle(self):
-        random.shuffle(self.cards)
-        self.top = 0
-
-    def hitme(self) -> Card:
-        if self.top >= len(self.cards):
-            self.reset()
-            random.shuffle(self.cards)
-            self.top = 0
-        c = self.cards[self.top]
-        self.top += 1
-        return c
-
-
-class Player:
-    def __init__(self, name: str = ""):
-        self.name = name
-        self.money = 0
-        self.cards = [Card(), Card()]
-        self.playing = True
-        self.round = True
-        self.is_ai = True
-        self.goodToGo = False
-        self.last_action = ""  # Track last action for display
-        self.bet_this_round = 0  # Track how much bet in current betting round
+# Seconds an AI seat may think before it checks or folds by default.
+AI_TIME_BUDGET = 2.0
+# Seconds "is thinking..." stays up at least, and an action stays on screen
+# (folds and calls a little shorter).
+AI_THINK_TIME = 0.5
+ACTION_PAUSE = 0.8
+PASSIVE_PAUSE = 0.5
+# Seconds before the first hand, after the deal and each new street, and
+# with every hand face up at showdown.
+START_PAUSE = 0.5
+STREET_PAUSE = 1.0
+SHOWDOWN_PAUSE = 3.0
+# Seconds between redraws while waiting.
+FRAME = 0.05
+# Seconds all-in equities stay up before the rest of the board is shown, and
+# runouts sampled for them preflop.
+EQUITY_PAUSE = 2.0
+EQUITY_SAMPLES = 20000
 
 
 class PokerGame:
-    """A minimal, stable poker game loop integrated with the pygame GUI.
+    """The pygame front end: draws a PokerEngine and feeds it the human's clicks.
 
     Goals fulfilled:
     - community cards persist on the table until the end of the hand
     - human actions are driven by GUI buttons (non-blocking polling)
     - players with zero money are removed from play
-    - simple betting model sufficient for UI testing
+    - all game rules live in the headless engine; this class only displays and waits
     """
 
-    def __init__(self):
-        self.players = [Player() for _ in range(6)]
-        self.deck = Deck()
-        self.tableCards = [Card() for _ in range(5)]
-        for c in self.tableCards:
-            c.rank = -1
-        self.pot = 0
+    def __init__(self, history_path: Optional[str] = None, session_dir: Optional[str] = None,
+                 seed: Optional[int] = None):
+        # Deck and every AI seat get their own stream of one seeded source
+        self.rng = RandomSource(seed)
+        self.engine = PokerEngine(rng=self.rng.substream(0))
+        # Event log and snapshots to resume the table after a restart
+        self.session = SessionLog(session_dir) if session_dir else None
+        # Finished hands are appended here when a history file is given
+        self.history = HandHistoryWriter(history_path) if history_path else None
+        # Live VPIP/PFR/AF/WTSD per player name, fed by the engine's action events
+        self.stats = PlayerStats()
+        self.engine.listeners.append(self.stats)
         self.gui = PokerGUI()
-        self.current_player = 4  # default human seat
         self.human_index = 4
-        self.betOn = 0  # Current bet amount that players need to match
+        # Short-stacked heads-up spots come from the solved push/fold table
+        streams = [self.rng.substream(1 + i) for i in range(NUM_SEATS)]
+        self.bots = [BotRunner(PushFoldBot(EquityBot(rng), rng=rng), budget=AI_TIME_BUDGET) for rng in streams]
 
-    def card_to_tuple(self, card: Card) -> Tuple[str, str]:
-        if card.rank < 0 or card.rank >= len(self.deck.ranks):
-            return ("", "")
-        if card.suit < 0 or card.suit >= len(self.deck.suits):
+    # The table state lives in the engine; these keep the old attribute names working.
+    @property
+    def players(self) -> List[Player]:
+        return self.engine.players
+
+    @property
+    def deck(self) -> Deck:
+        return self.engine.deck
+
+    @property
+    def tableCards(self) -> List[int]:
+        return self.engine.tableCards
+
+    @property
+    def pot(self) -> int:
+        return self.engine.pot
+
+    @property
+    def betOn(self) -> int:
+        return self.engine.betOn
+
+    @property
+    def current_player(self) -> int:
+        return self.engine.current_player
+
+    def card_to_tuple(self, card: int) -> Tuple[str, str]:
+        if card < 0 or card >= NUM_CARDS:
             return ("", "")
-        return (self.deck.ranks[card.rank], self.deck.suits[card.suit])
+        return (self.deck.ranks[card_rank(card)], self.deck.suits[card_suit(card)])
 
-    def get_game_state(self, showdown=False) -> dict:
+    def get_game_state(self, showdown=False, board_size: int = 5) -> dict:
         players_data = []
         for i, p in enumerate(self.players):
             # At showdown, show all cards of players still in the round
@@ -107,8 +120,8 @@ class PokerGame:
             })
         community = []
         # always return exactly 5 slots; GUI will render backs for unknown cards
-        for c in self.tableCards:
-            if c.rank >= 0:
+        for i, c in enumerate(self.tableCards):
+            if c >= 0 and i < board_size:
                 community.append(self.card_to_tuple(c))
             else:
                 community.append(None)
@@ -121,8 +134,9 @@ class PokerGame:
             'available_actions': []
         }
 
-    def update_display(self, extra_actions: List[str] = None, action_text: str = "", showdown=False):
-        state = self.get_game_state(showdown=showdown)
+    def update_display(self, extra_actions: List[str] = None, action_text: str = "", showdown=False,
+                       board_size: int = 5):
+        state = self.get_game_state(showdown=showdown, board_size=board_size)
         if extra_actions:
             state['available_actions'] = extra_actions
         if action_text:
@@ -130,558 +144,253 @@ class PokerGame:
             self.gui.current_action = action_text
         self.gui.draw(state)
 
+    def pause(self, seconds: float, ready=None, **display) -> bool:
+        """Keep redrawing and handling input for ``seconds``, and after that
+        until ``ready()`` is true if given. Returns False if the player quit."""
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end or (ready is not None and not ready()):
+            if self.gui.handle_input() == 'QUIT':
+                return False
+            self.update_display(**display)
+            time.sleep(FRAME)
+        return True
+
     def start(self, name: str):
         names = ["Alex", "Ivan", "Boris", "Lisa", name, "Katya"]
+        # Seats are named before the saved hands are replayed, so the stats
+        # count them for the right players
         for i, p in enumerate(self.players):
             p.name = names[i]
-            p.money = 1000
+        # Resume the saved session, unless there is none or it was already lost
+        restored = self.session is not None and self.session.restore(self.engine)
+        if restored and (self.players[self.human_index].money <= 0 and self.engine.is_terminal()):
+            restored = False
+        for i, p in enumerate(self.players):
+            p.name = names[i]  # a snapshot brings back the names it was saved with
             p.is_ai = (i != self.human_index)
-            p.playing = True
-            p.round = True
+            if not restored:
+                p.money = STARTING_MONEY
+                p.playing = True
+                p.round = True
+        if self.session is not None:
+            self.engine.listeners.append(self.session)
 
         self.run()
 
-    def deal(self):
-        self.deck.reset()
-        self.deck.shuffle()
-        for i in range(6):
-            if self.players[i].playing:
-                self.players[i].cards[0] = self.deck.hitme()
-                self.players[i].cards[1] = self.deck.hitme()
-        for c in self.tableCards:
-            c.rank = -1
-
-    def flop(self):
-        for i in range(3):
-            self.tableCards[i] = self.deck.hitme()
-
-    def turn(self):
-        self.tableCards[3] = self.deck.hitme()
-
-    def river(self):
-        self.tableCards[4] = self.deck.hitme()
-    
-    def get_hand_score(self, hand: List[Card]) -> tuple:
-        """Calculate poker hand score as tuple for proper comparison with kickers.
-        Returns: (hand_rank, primary_value, kicker1, kicker2, kicker3, ...)
+    def get_hand_score(self, hand: List[int]) -> int:
+        """Calculate poker hand score as a single integer; higher beats lower.
+        Kickers are included, so equal scores are true ties (see hand_evaluator).
         """
-        hand_sorted = sorted(hand, key=lambda x: x.rank, reverse=True)
-        
-        # Count rank frequencies
-        rank_counts = {}
-        for card in hand_sorted:
-            rank_counts[card.rank] = rank_counts.get(card.rank, 0) + 1
-        
-        # Sort by count, then by rank
-        sorted_ranks = sorted(rank_counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
-        
-        # Check for flush
-        suits = [card.suit for card in hand]
-        is_flush = len(set(suits)) == 1
-        
-        # Check for straight
-        ranks = sorted([card.rank for card in hand])
-        is_straight = all(ranks[i] == ranks[i-1] + 1 for i in range(1, 5))
-        # Special case: A-2-3-4-5 (wheel)
-        if ranks == [0, 1, 2, 3, 12]:
-            is_straight = True
-            ranks = [0, 1, 2, 3, 4]  # Treat ace as low
-        
-        # Get kickers (cards not part of the main combination)
-        def get_kickers(exclude_ranks, count):
-            kickers = []
-            for card in hand_sorted:
-                if card.rank not in exclude_ranks:
-                    kickers.append(card.rank)
-                if len(kickers) >= count:
-                    break
-            return tuple(kickers + [0] * (count - len(kickers)))
-        
-        # Straight Flush
-        if is_straight and is_flush:
-            return (8, max(ranks), 0, 0, 0)
-        
-        # Four of a Kind
-        if sorted_ranks[0][1] == 4:
-            quad_rank = sorted_ranks[0][0]
-            kicker = get_kickers([quad_rank], 1)
-            return (7, quad_rank, kicker[0], 0, 0)
-        
-        # Full House
-        if sorted_ranks[0][1] == 3 and sorted_ranks[1][1] == 2:
-            return (6, sorted_ranks[0][0], sorted_ranks[1][0], 0, 0)
-        
-        # Flush
-        if is_flush:
-            all_ranks = tuple(sorted([card.rank for card in hand_sorted], reverse=True))
-            return (5,) + all_ranks
-        
-        # Straight
-        if is_straight:
-            return (4, max(ranks), 0, 0, 0)
-        
-        # Three of a Kind
-        if sorted_ranks[0][1] == 3:
-            trip_rank = sorted_ranks[0][0]
-            kickers = get_kickers([trip_rank], 2)
-            return (3, trip_rank, kickers[0], kickers[1], 0)
-        
-        # Two Pair
-        if sorted_ranks[0][1] == 2 and sorted_ranks[1][1] == 2:
-            high_pair = max(sorted_ranks[0][0], sorted_ranks[1][0])
-            low_pair = min(sorted_ranks[0][0], sorted_ranks[1][0])
-            kickers = get_kickers([high_pair, low_pair], 1)
-            return (2, high_pair, low_pair, kickers[0], 0)
-        
-        # One Pair
-        if sorted_ranks[0][1] == 2:
-            pair_rank = sorted_ranks[0][0]
-            kickers = get_kickers([pair_rank], 3)
-            return (1, pair_rank, kickers[0], kickers[1], kickers[2])
-        
-        # High Card
-        all_ranks = tuple(sorted([card.rank for card in hand_sorted], reverse=True))
-        return (0,) + all_ranks
+        return evaluate5(*hand)
     
-    def evaluate_best_hand(self, player_idx: int) -> tuple:
-        """Find best 5-card combination from player's 2 cards + 5 community cards.
-        Returns tuple for proper comparison with kickers.
+    def evaluate_best_hand(self, player_idx: int) -> int:
+        """Score the best 5-card hand from player's 2 cards + 5 community cards.
+        Any 5 of the 7 may play, including the board alone.
+        Returns the hand score, or 0 if the player has folded.
         """
-        if not self.players[player_idx].round:
-            return (-1, 0, 0, 0, 0)
-        
-        best_score = (-1, 0, 0, 0, 0)
-        # Try all combinations of 3 cards from table + 2 player cards
-        for i in range(5):
-            for j in range(i + 1, 5):
-                for k in range(j + 1, 5):
-                    hand = [
-                        self.tableCards[i],
-                        self.tableCards[j],
-                        self.tableCards[k],
-                        self.players[player_idx].cards[0],
-                        self.players[player_idx].cards[1]
-                    ]
-                    score = self.get_hand_score(hand)
-                    if score > best_score:
-                        best_score = score
-        
-        return best_score
+        return self.engine.evaluate_best_hand(player_idx)
     
-    def get_hand_name(self, score: tuple) -> str:
-        """Convert hand score tuple to readable name."""
-        hand_rank = score[0]
-        hand_names = [
-            "High Card",
-            "Pair",
-            "Two Pair",
-            "Three of a Kind",
-            "Straight",
-            "Flush",
-            "Full House",
-            "Four of a Kind",
-            "Straight Flush"
-        ]
-        if hand_rank >= 0 and hand_rank < len(hand_names):
-            return hand_names[hand_rank]
-        return "Unknown Hand"
+    def get_hand_name(self, score: int) -> str:
+        """Convert hand score to readable name."""
+        return hand_name(score)
+
+    def showdown_equity(self, board_size: int) -> Dict[int, dict]:
+        """Win/tie/lose/equity percentages for players still in the hand with the first
+        ``board_size`` community cards known; keyed by seat index. Exact from the
+        flop on, sampled preflop.
+        """
+        active = [i for i, p in enumerate(self.players) if p.round]
+        holes = [self.players[i].cards for i in active]
+        board = self.tableCards[:board_size]
+        if board_size >= 3:
+            results = exact_equity(holes, board)
+        else:
+            results = calculate_equity(holes, board, iterations=EQUITY_SAMPLES, workers=1)
+        return dict(zip(active, results))
+
+    def all_in_street(self) -> int:
+        """Street of the last action if the board was run out after it with nobody
+        left to bet (everyone still in was all-in), else -1."""
+        if self.engine.street != SHOWDOWN or not self.engine.history:
+            return -1
+        street = self.engine.history[-1][0]
+        return street if street < RIVER else -1
+
+    def describe_action(self, idx: int) -> str:
+        """Turn a player's last_action ("Call $20") into a status line ("Ivan calls $20")."""
+        action = self.players[idx].last_action
+        verb, _, amount = action.partition(" ")
+        phrases = {
+            "Fold": "folds",
+            "Check": "checks",
+            "Call": f"calls {amount}",
+            "Bet": f"bets {amount}",
+            "Raise": f"raises to {amount}",
+            "All-in": f"goes all-in {amount}",
+        }
+        return f"{self.players[idx].name} {phrases.get(verb, action)}"
+
+    def human_action(self, idx: int):
+        """Poll the GUI until the human picks an action.
+        Returns (action, amount), or None if the player requested quit.
+        """
+        actions_for_human = self.engine.legal_actions()
+        bet_info = f" (bet: ${self.betOn})" if self.betOn > 0 else ""
+        self.update_display(extra_actions=actions_for_human,
+                            action_text=f"Your turn, {self.players[idx].name}{bet_info}")
+        # poll until human chooses
+        while True:
+            ev = self.gui.handle_input()
+            if ev == 'QUIT':
+                return None
+            if ev == 'Raise' and ev in actions_for_human:
+                # Show raise dialog
+                self.gui.show_raise_dialog = True
+                self.gui.min_raise, self.gui.max_raise = self.engine.raise_bounds()
+                # Default raise amount
+                self.gui.raise_amount = self.gui.min_raise
+                
+                # Initial draw with raise dialog
+                state = self.get_game_state()
+                state['available_actions'] = actions_for_human
+                self.gui.draw(state)
+                
+                while self.gui.show_raise_dialog:
+                    prev_amount = self.gui.raise_amount
+                    ev = self.gui.handle_input()
+                    if ev == 'QUIT':
+                        return None
+                    elif ev == 'RAISE_CONFIRM':
+                        self.gui.show_raise_dialog = False
+                        return RAISE, self.gui.raise_amount
+                    elif ev == 'RAISE_CANCEL':
+                        self.gui.show_raise_dialog = False
+                        break
+                    
+                    # Redraw if amount changed (from +/- buttons)
+                    if self.gui.raise_amount != prev_amount:
+                        state = self.get_game_state()
+                        state['available_actions'] = actions_for_human
+                        self.gui.draw(state)
+                    
+                    time.sleep(0.05)
+                
+                self.gui.show_raise_dialog = False
+            elif ev in actions_for_human:
+                return ev, 0
+            # redraw to keep screen responsive
+            self.update_display(extra_actions=actions_for_human)
+            time.sleep(0.05)
 
     def simple_betting_round(self) -> bool:
         """Betting round with fold, call, raise, and all-in options.
         Human chooses using GUI buttons. This function polls GUI input (non-blocking) so the
         event loop continues and community cards stay visible.
+        Plays until the engine moves to the next street or ends the hand.
         Returns False if the player requested quit.
         """
-        bet_amount = 10
-        
-        # Reset goodToGo flags for this round
-        for p in self.players:
-            p.goodToGo = False
+        street = self.engine.street
+        while not self.engine.is_terminal() and self.engine.street == street:
+            idx = self.current_player
+            if not self.players[idx].is_ai:
+                choice = self.human_action(idx)
+                if choice is None:
+                    return False
+                self.engine.apply(*choice)
+                if not self.pause(PASSIVE_PAUSE if choice[0] in (FOLD, CHECK_CALL) else ACTION_PAUSE,
+                                  action_text=self.describe_action(idx)):
+                    return False
+            else:
+                # AI action: the bot decides on its worker thread while the window
+                # keeps drawing and a quit is handled at once
+                decision = self.bots[idx].start(self.engine)
+                if not self.pause(AI_THINK_TIME, decision.ready,
+                                  action_text=f"{self.players[idx].name} is thinking..."):
+                    return False
+                self.engine.apply(*decision.action())
+                # Show action result
+                if not self.pause(ACTION_PAUSE, action_text=self.describe_action(idx)):
+                    return False
+        return True
+
+    def wait_for_continue(self, showdown: bool) -> bool:
+        """Show a Continue button until clicked. Returns False on quit."""
+        state = self.get_game_state(showdown=showdown)
+        state['available_actions'] = ['Continue']
+        self.gui.draw(state)
         
-        # Continue betting until all active players have goodToGo flag set
         while True:
-            # Check if all active players are goodToGo
-            all_done = True
-            for p in self.players:
-                if p.round and p.playing and not p.goodToGo:
-                    all_done = False
-                    break
-            if all_done:
-                break
-            
-            for idx in range(6):
-                if not self.players[idx].round or not self.players[idx].playing:
-                    continue
-                if self.players[idx].goodToGo:
-                    continue
-                # Skip players who are all-in (no money left)
-                if self.players[idx].money <= 0:
-                    self.players[idx].goodToGo = True
-                    continue
-                
-                self.current_player = idx
-                # show UI with available actions if this is human
-                if not self.players[idx].is_ai:
-                    # Determine available actions
-                    can_call = self.players[idx].money >= self.betOn
-                    can_raise = self.players[idx].money > self.betOn
-                    
-                    if self.betOn > 0:
-                        if can_raise:
-                            actions_for_human = ['Fold', 'Check/Call', 'Raise', 'All-In']
-                        elif can_call:
-                            actions_for_human = ['Fold', 'Check/Call', 'All-In']
-                        else:
-                            actions_for_human = ['Fold', 'All-In']
-                    else:
-                        actions_for_human = ['Fold', 'Check/Call', 'Raise', 'All-In']
-                    
-                    bet_info = f" (bet: ${self.betOn})" if self.betOn > 0 else ""
-                    self.update_display(extra_actions=actions_for_human,
-                                        action_text=f"Your turn, {self.players[idx].name}{bet_info}")
-                    # poll until human chooses
-                    while True:
-                        ev = self.gui.handle_input()
-                        if ev == 'QUIT':
-                            return False
-                        if ev in actions_for_human:
-                            if ev == 'Fold':
-                                self.players[idx].round = False
-                                self.players[idx].last_action = "Fold"
-                                self.update_display(action_text=f"{self.players[idx].name} folds")
-                                pygame.time.wait(500)
-                            elif ev == 'Check/Call':
-                                if self.betOn > 0:
-                                    # Call: pay the full betOn amount
-                                    pay = min(self.betOn, self.players[idx].money)
-                                    self.players[idx].money -= pay
-                                    self.pot += pay
-                                    self.players[idx].goodToGo = True
-                                    self.players[idx].last_action = f"Call ${pay}"
-                                    self.update_display(action_text=f"{self.players[idx].name} calls ${pay}")
-                                else:
-                                    self.players[idx].goodToGo = True
-                                    self.players[idx].last_action = "Check"
-                                    self.update_display(action_text=f"{self.players[idx].name} checks")
-                                pygame.time.wait(500)
-                            elif ev == 'Raise':
-                                # Show raise dialog
-                                self.gui.show_raise_dialog = True
-                                # Min raise = current bet + minimum raise (at least double)
-                                self.gui.min_raise = self.betOn + 10 if self.betOn > 0 else 10
-                                # Max raise = player's money
-                                self.gui.max_raise = self.players[idx].money
-                                # Default raise amount
-                                self.gui.raise_amount = min(self.gui.min_raise, self.gui.max_raise)
-                                
-                                # Initial draw with raise dialog
-                                state = self.get_game_state()
-                                state['available_actions'] = actions_for_human
-                                self.gui.draw(state)
-                                
-                                while self.gui.show_raise_dialog:
-                                    prev_amount = self.gui.raise_amount
-                                    ev = self.gui.handle_input()
-                                    if ev == 'QUIT':
-                                        return False
-                                    elif ev == 'RAISE_CONFIRM':
-                                        raise_amount = self.gui.raise_amount
-                                        # Calculate additional bet: difference from current bet
-                                        additional_bet = raise_amount - self.betOn
-                                        
-                                        if additional_bet > self.players[idx].money:
-                                            additional_bet = self.players[idx].money
-                                            raise_amount = self.betOn + additional_bet
-                                        
-                                        self.pot += additional_bet
-                                        self.players[idx].money -= additional_bet
-                                        self.betOn = raise_amount
-                                        
-                                        self.players[idx].goodToGo = True
-                                        self.players[idx].last_action = f"Raise ${self.betOn}"
-                                        # Reset other players' goodToGo flags
-                                        for i in range(6):
-                                            if i != idx:
-                                                self.players[i].goodToGo = False
-                                        
-                                        self.gui.show_raise_dialog = False
-                                        self.update_display(action_text=f"{self.players[idx].name} raises to ${self.betOn}")
-                                        pygame.time.wait(800)
-                                        break
-                                    elif ev == 'RAISE_CANCEL':
-                                        self.gui.show_raise_dialog = False
-                                        break
-                                    
-                                    # Redraw if amount changed (from +/- buttons)
-                                    if self.gui.raise_amount != prev_amount:
-                                        state = self.get_game_state()
-                                        state['available_actions'] = actions_for_human
-                                        self.gui.draw(state)
-                                    
-                                    time.sleep(0.05)
-                                
-                                self.gui.show_raise_dialog = False
-                                if ev == 'RAISE_CANCEL':
-                                    continue
-                            elif ev == 'All-In':
-                                pay = self.players[idx].money
-                                self.pot += pay
-                                self.players[idx].money = 0
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"All-in ${pay}"
-                                
-                                # If all-in is more than current bet, update betOn and reset other players
-                                if pay > self.betOn:
-                                    self.betOn = pay
-                                    for i in range(6):
-                                        if i != idx:
-                                            self.players[i].goodToGo = False
-                                
-                                self.update_display(action_text=f"{self.players[idx].name} goes all-in ${pay}")
-                                pygame.time.wait(800)
-                            break
-                        # redraw to keep screen responsive
-                        self.update_display(extra_actions=actions_for_human)
-                        time.sleep(0.05)
-                else:
-                    # AI action
-                    self.update_display(action_text=f"{self.players[idx].name} is thinking...")
-                    # Check for quit events during AI turn
-                    for _ in range(10):
-                        ev = self.gui.handle_input()
-                        if ev == 'QUIT':
-                            return False
-                        time.sleep(0.05)
-                    
-                    # Simple AI logic
-                    can_call = self.players[idx].money >= self.betOn
-                    can_raise = self.players[idx].money > self.betOn
-                    
-                    # Calculate AI action based on hand strength
-                    high_card = max(self.players[idx].cards[0].rank, self.players[idx].cards[1].rank)
-                    pair = self.players[idx].cards[0].rank == self.players[idx].cards[1].rank
-                    
-                    action_choice = random.random()
-                    
-                    if high_card < 8 and not pair:
-                        # Weak hand - mostly fold or check
-                        if self.betOn > bet_amount:
-                            self.players[idx].round = False
-                            self.players[idx].last_action = "Fold"
-                            action_msg = f"{self.players[idx].name} folds"
-                        elif self.betOn > 0:
-                            if action_choice < 0.3 and can_call:
-                                pay = min(self.betOn, self.players[idx].money)
-                                self.players[idx].money -= pay
-                                self.pot += pay
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Call ${pay}"
-                                action_msg = f"{self.players[idx].name} calls ${pay}"
-                            else:
-                                self.players[idx].round = False
-                                self.players[idx].last_action = "Fold"
-                                action_msg = f"{self.players[idx].name} folds"
-                        else:
-                            self.players[idx].goodToGo = True
-                            self.players[idx].last_action = "Check"
-                            action_msg = f"{self.players[idx].name} checks"
-                    elif high_card >= 10 or pair:
-                        # Strong hand - call or raise
-                        if self.betOn > 0:
-                            if action_choice < 0.6 and can_call:
-                                pay = min(self.betOn, self.players[idx].money)
-                                self.players[idx].money -= pay
-                                self.pot += pay
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Call ${pay}"
-                                action_msg = f"{self.players[idx].name} calls ${pay}"
-                            elif can_raise and action_choice < 0.85:
-                                # Raise
-                                min_raise = self.betOn * 2
-                                max_raise = min(self.players[idx].money, self.betOn * 3)
-                                raise_to = random.randint(min_raise, max_raise) if max_raise > min_raise else min_raise
-                                
-                                # Calculate additional bet (difference from current bet)
-                                additional_bet = raise_to - self.betOn
-                                additional_bet = min(additional_bet, self.players[idx].money)
-                                
-                                self.pot += additional_bet
-                                self.players[idx].money -= additional_bet
-                                self.betOn = raise_to
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Raise ${self.betOn}"
-                                
-                                # Reset other players
-                                for i in range(6):
-                                    if i != idx:
-                                        self.players[i].goodToGo = False
-                                
-                                action_msg = f"{self.players[idx].name} raises to ${self.betOn}"
-                            else:
-                                pay = min(self.betOn, self.players[idx].money)
-                                self.players[idx].money -= pay
-                                self.pot += pay
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Call ${pay}"
-                                action_msg = f"{self.players[idx].name} calls ${pay}"
-                        else:
-                            # No bet yet - bet or check
-                            if action_choice < 0.5:
-                                bet = random.randint(bet_amount, bet_amount * 3)
-                                bet = min(bet, self.players[idx].money)
-                                self.pot += bet
-                                self.players[idx].money -= bet
-                                self.betOn = bet
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Bet ${bet}"
-                                
-                                for i in range(6):
-                                    if i != idx:
-                                        self.players[i].goodToGo = False
-                                
-                                action_msg = f"{self.players[idx].name} bets ${bet}"
-                            else:
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = "Check"
-                                action_msg = f"{self.players[idx].name} checks"
-                    else:
-                        # Medium hand
-                        if self.betOn > 0:
-                            if action_choice < 0.7 and can_call:
-                                pay = min(self.betOn, self.players[idx].money)
-                                self.players[idx].money -= pay
-                                self.pot += pay
-                                self.players[idx].goodToGo = True
-                                self.players[idx].last_action = f"Call ${pay}"
-                                action_msg = f"{self.players[idx].name} calls ${pay}"
-                            else:
-                                self.players[idx].round = False
-                                self.players[idx].last_action = "Fold"
-                                action_msg = f"{self.players[idx].name} folds"
-                        else:
-                            self.players[idx].goodToGo = True
-                            self.players[idx].last_action = "Check"
-                            action_msg = f"{self.players[idx].name} checks"
-                    
-                    # Show action result
-                    self.update_display(action_text=action_msg)
-                    pygame.time.wait(800)  # Pause to show action
-        return True
+            ev = self.gui.handle_input()
+            if ev == 'QUIT':
+                return False
+            elif ev == 'Continue':
+                return True
+            time.sleep(0.05)
 
     def run(self):
-        running = True
-        self.gui.current_action = "Game started"
-        self.update_display()
-        time.sleep(0.5)
-
-        while running and sum(1 for p in self.players if p.money > 0) > 1:
-            # setup round
-            for p in self.players:
-                p.round = p.money > 0
-                p.playing = p.money > 0
-                p.last_action = ""  # Reset action display for new round
-            self.pot = 0
-            self.betOn = 0
-            self.deal()
-            self.update_display(action_text="Dealt")
-            pygame.time.wait(1000)
-
-            if not self.simple_betting_round():
-                break
-
-            self.flop()
-            self.betOn = 0
-            for p in self.players:
-                p.goodToGo = False
-            self.update_display(action_text="Flop")
-            pygame.time.wait(1000)
-            if not self.simple_betting_round():
-                break
+        running = self.pause(START_PAUSE, action_text="Game started")
 
-            self.turn()
-            self.betOn = 0
-            for p in self.players:
-                p.goodToGo = False
-            self.update_display(action_text="Turn")
-            pygame.time.wait(1000)
-            if not self.simple_betting_round():
-                break
-
-            self.river()
-            self.betOn = 0
-            for p in self.players:
-                p.goodToGo = False
-            self.update_display(action_text="River")
-            pygame.time.wait(1000)
-            if not self.simple_betting_round():
-                break
+        # A restored session may come back in the middle of a hand
+        while running and (not self.engine.is_terminal() or self.engine.players_with_money() > 1):
+            if self.engine.is_terminal():
+                self.engine.reset()
+                if not self.pause(STREET_PAUSE, action_text="Dealt"):
+                    break
 
-            # Showdown - reveal all cards and determine winner
-            active = [i for i, p in enumerate(self.players) if p.round]
-            if active:
-                # Show all remaining players' cards
-                self.gui.current_action = "Showdown!"
-                self.update_display(showdown=True)
-                pygame.time.wait(2000)  # Pause to see all cards
-                
-                # Check for quit during showdown
-                for _ in range(20):
-                    ev = self.gui.handle_input()
-                    if ev == 'QUIT':
-                        running = False
-                        break
-                    time.sleep(0.05)
-                
-                if not running:
+            while not self.engine.is_terminal():
+                if not self.simple_betting_round():
+                    running = False
                     break
-                
-                # Evaluate hands and find winner
-                best_score = (-1, 0, 0, 0, 0)
-                winner = active[0]
-                for player_idx in active:
-                    score = self.evaluate_best_hand(player_idx)
-                    if score > best_score:
-                        best_score = score
-                        winner = player_idx
-                
-                hand_name = self.get_hand_name(best_score)
-                self.players[winner].money += self.pot
-                self.gui.current_action = f"{self.players[winner].name} wins ${self.pot} with {hand_name}!"
-                
-                # Wait for user to click Continue button
-                state = self.get_game_state(showdown=True)
-                state['available_actions'] = ['Continue']
-                self.gui.draw(state)
-                
-                waiting = True
-                while waiting:
-                    ev = self.gui.handle_input()
-                    if ev == 'QUIT':
-                        running = False
-                        waiting = False
-                    elif ev == 'Continue':
-                        waiting = False
-                    time.sleep(0.05)
-                
-                if not running:
+                if not self.engine.is_terminal() and not self.pause(
+                        STREET_PAUSE, action_text=STREET_NAMES[self.engine.street]):
+                    running = False
                     break
-                
-                # Check if human player is out of money
-                if self.players[self.human_index].money <= 0:
-                    self.gui.current_action = "Game Over - You ran out of money!"
-                    state = self.get_game_state(showdown=False)
-                    state['available_actions'] = ['Continue']
-                    self.gui.draw(state)
-                    
-                    # Wait for user acknowledgment
-                    waiting = True
-                    while waiting:
-                        ev = self.gui.handle_input()
-                        if ev == 'QUIT' or ev == 'Continue':
-                            waiting = False
-                        time.sleep(0.05)
+
+            if not running:
+                break
+            if self.history:
+                self.history.write_engine(self.engine)
+
+            showdown = self.engine.street == SHOWDOWN
+            all_in = self.all_in_street()
+            if all_in >= 0:
+                # Everyone is all-in: show the odds before the rest of the board
+                board_size = BOARD_SIZES[all_in]
+                odds = ", ".join(f"{self.players[seat].name} {result['equity']:.0f}%"
+                                 for seat, result in self.showdown_equity(board_size).items())
+                if not self.pause(EQUITY_PAUSE, action_text=f"All-in! {odds}", showdown=True,
+                                  board_size=board_size):
                     break
+            # Show all remaining players' cards
+            if showdown and not self.pause(SHOWDOWN_PAUSE, action_text="Showdown!", showdown=True):
+                break
+
+            names = " and ".join(self.players[seat].name for seat, _ in self.engine.awards)
+            won = sum(amount for _, amount in self.engine.awards)
+            verb = "split" if len(self.engine.awards) > 1 else "wins"
+            message = f"{names} {verb} ${won}"
+            if showdown:
+                hand_name = self.get_hand_name(max(self.engine.showdown_scores.values()))
+                message += f" with {hand_name}!"
+            self.gui.current_action = message
+
+            # Wait for user to click Continue button
+            if not self.wait_for_continue(showdown=showdown):
+                break
+            
+            # Check if human player is out of money
+            if self.players[self.human_index].money <= 0:
+                self.gui.current_action = "Game Over - You ran out of money!"
+                # Wait for user acknowledgment
+                self.wait_for_continue(showdown=False)
+                break
 
+        for bot in self.bots:
+            bot.close()
+        if self.history:
+            self.history.close()
+        if self.session:
+            self.session.close()
         pygame.quit()
 
 
@@ -742,7 +451,7 @@ def main():
         pygame.quit()
         return
 
-    game = PokerGame()
+    game = PokerGame(default_history_path(), os.environ.get("POKER_SESSION"), default_seed())
     game.start(player_name)
 
 
@@ -0,0 +1,246 @@
+"""Import PokerStars-style text hand histories.
+
+Files are read in blocks of ``CHUNK_BYTES`` that are cut back to the last
+"PokerStars Hand #..." header, so every chunk holds whole hands. Chunks are
+split and parsed in a process pool while the file is still being read, with
+a bounded number in flight, so memory stays flat on multi-GB archives and
+parsing scales with cores. Hands come back in file order:
+
+    for hand in import_file("HH20240101 Table.txt"):
+        ...
+
+Each hand maps onto the game's model: ``Player`` objects (name, starting
+stack, hole cards as card codes where they were shown or dealt to the hero),
+card codes for the board, and actions as (street, player index, action,
+chips put in) like ``PokerEngine.history``. Blinds and antes use the extra
+action ``POST``. Cash-game amounts are in cents, tournament amounts in chips.
+"""
+
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from cards import NO_CARD, card_code
+from hand_evaluator import evaluate7
+from poker_engine import ALL_IN, CHECK_CALL, FLOP, FOLD, PREFLOP, RAISE, RIVER, SHOWDOWN, TURN, Player
+
+# Text per task sent to a worker (about 250 hands).
+CHUNK_BYTES = 256 * 1024
+
+POST = "Post"
+
+RANK_CHARS = "23456789TJQKA"
+SUIT_CHARS = "dshc"  # same order as the suits in cards.py
+
+_HAND_START = re.compile(r"^PokerStars (?:Zoom )?(?:Hand|Game) #(\d+)")
+_HAND_SPLIT = re.compile(r"^PokerStars (?:Zoom )?(?:Hand|Game) #", re.MULTILINE)
+_TABLE = re.compile(r"^Table '([^']*)' (\d+)-max.*?Seat #(\d+) is the button")
+_SEAT = re.compile(r"^Seat (\d+): (.+?) \((\S+) in chips(?:, \S+ bounty)?\)( is sitting out)?")
+_STREET = re.compile(r"^\*\*\* (HOLE CARDS|FLOP|TURN|RIVER|SHOW DOWN|SUMMARY) \*\*\*")
+_DEALT = re.compile(r"^Dealt to (.+?) \[(\S\S) (\S\S)\]")
+_ACTION = re.compile(r"^(.+?): (posts small & big blinds|posts small blind|posts big blind|posts the ante|"
+                     r"folds|checks|calls|bets|raises)(?: (\S+))?(?: to (\S+))?( and is all-in)?")
+_SHOWS = re.compile(r"^(.+?): shows \[(\S\S) (\S\S)\]")
+_COLLECTED = re.compile(r"^(.+?) collected (\S+) from (?:side |main )?pot")
+_UNCALLED = re.compile(r"^Uncalled bet \((\S+)\) returned to (.+)$")
+_BOARD = re.compile(r"^Board \[([^\]]*)\]")
+
+_STREETS = {"HOLE CARDS": PREFLOP, "FLOP": FLOP, "TURN": TURN, "RIVER": RIVER,
+            "SHOW DOWN": SHOWDOWN, "SUMMARY": SHOWDOWN}
+
+
+class ImportedHand(NamedTuple):
+    hand_id: int
+    table: str
+    max_seats: int
+    button: int                     # index into players, -1 if unknown
+    seat_numbers: List[int]         # site seat number of each player
+    players: List[Player]           # money = stack at the start of the hand
+    board: List[int]
+    actions: List[Tuple[int, int, str, int]]
+    awards: List[Tuple[int, int]]   # (player index, amount collected)
+    returned: List[Tuple[int, int]]  # uncalled bets given back
+
+    def hand_strength(self, index: int) -> int:
+        """Evaluator strength of a player's 7 cards, or 0 if they are not all known."""
+        cards = self.players[index].cards + self.board
+        if len(cards) != 7 or NO_CARD in cards:
+            return 0
+        return evaluate7(cards)
+
+
+def parse_card(text: str) -> int:
+    """Card code from a two-letter card like "Ah" or "Td"."""
+    return card_code(SUIT_CHARS.index(text[1]), RANK_CHARS.index(text[0]))
+
+
+def _amount(text: str, cents: bool) -> int:
+    value = Decimal(text.lstrip("$€£").replace(",", ""))
+    return int(value * 100) if cents else int(value)
+
+
+def parse_hand(text: str) -> ImportedHand:
+    """Parse the text of one hand."""
+    lines = text.splitlines()
+    header = _HAND_START.match(lines[0])
+    if not header:
+        raise ValueError("not a PokerStars hand: %r" % lines[0][:60])
+    # A tournament header shows its buy-in ("$10+$1") but its stacks are chips
+    cents = "Tournament #" not in lines[0] and any(symbol in lines[0] for symbol in "$€£")
+    table, max_seats, button_seat = "", 0, 0
+    seat_numbers: List[int] = []
+    players: List[Player] = []
+    index = {}
+    board: List[int] = []
+    actions = []
+    awards = []
+    returned = []
+    street = None
+    put_in = {}  # chips each player has put in on the current street
+
+    for line in lines[1:]:
+        m = _STREET.match(line)
+        if m:
+            street = _STREETS[m.group(1)]
+            if street != PREFLOP:
+                # Blinds posted before the hole cards count toward the preflop bet
+                put_in = {}
+            continue
+        if street is None:
+            m = _TABLE.match(line)
+            if m:
+                table, max_seats, button_seat = m.group(1), int(m.group(2)), int(m.group(3))
+                continue
+            m = _SEAT.match(line)
+            if m:
+                p = Player(m.group(2))
+                p.money = _amount(m.group(3), cents)
+                p.playing = not m.group(4)
+                p.round = p.playing
+                p.is_ai = False
+                p.cards = [NO_CARD, NO_CARD]
+                index[p.name] = len(players)
+                seat_numbers.append(int(m.group(1)))
+                players.append(p)
+                continue
+        m = _ACTION.match(line)
+        if m and m.group(1) in index:
+            i = index[m.group(1)]
+            verb = m.group(2)
+            already = put_in.get(i, 0)
+            if verb == "folds":
+                action, paid = FOLD, 0
+                players[i].round = False
+            elif verb == "checks":
+                action, paid = CHECK_CALL, 0
+            elif verb == "raises":
+                action, paid = RAISE, _amount(m.group(4), cents) - already
+            elif verb in ("calls", "bets"):
+                action = CHECK_CALL if verb == "calls" else RAISE
+                paid = _amount(m.group(3), cents)
+            else:
+                action, paid = POST, _amount(m.group(3), cents)
+            if m.group(5):
+                action = ALL_IN
+            # Antes are dead money; they do not count toward calling the bet.
+            if verb != "posts the ante":
+                put_in[i] = already + paid
+            actions.append((street if street is not None else PREFLOP, i, action, paid))
+            continue
+        m = _DEALT.match(line) or _SHOWS.match(line)
+        if m and m.group(1) in index:
+            players[index[m.group(1)]].cards = [parse_card(m.group(2)), parse_card(m.group(3))]
+            continue
+        m = _COLLECTED.match(line)
+        if m and m.group(1) in index:
+            awards.append((index[m.group(1)], _amount(m.group(2), cents)))
+            continue
+        m = _UNCALLED.match(line)
+        if m and m.group(2) in index:
+            returned.append((index[m.group(2)], _amount(m.group(1), cents)))
+            continue
+        m = _BOARD.match(line)
+        if m:
+            board = [parse_card(c) for c in m.group(1).split()]
+
+    button = seat_numbers.index(button_seat) if button_seat in seat_numbers else -1
+    return ImportedHand(int(header.group(1)), table, max_seats, button, seat_numbers, players,
+                        board, actions, awards, returned)
+
+
+def split_hands(text: str) -> List[str]:
+    """Cut text into hands at each "PokerStars Hand #" header line."""
+    starts = [m.start() for m in _HAND_SPLIT.finditer(text)]
+    return [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)])]
+
+
+def parse_chunk(text: str) -> List[ImportedHand]:
+    return [parse_hand(hand) for hand in split_hands(text)]
+
+
+def read_chunks(path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[str]:
+    """Yield pieces of a file of about ``chunk_bytes`` that end on a hand boundary.
+
+    Only the cut points are searched here; splitting into hands is left to
+    ``parse_chunk`` so it runs in the workers.
+    """
+    tail = ""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            text = tail + block
+            cut = text.rfind("\nPokerStars ") + 1
+            if cut <= 0:
+                tail = text
+                continue
+            yield text[:cut]
+            tail = text[cut:]
+    if tail.strip():
+        yield tail
+
+
+def import_files(paths: List[str], workers: Optional[int] = None,
+                 chunk_bytes: int = CHUNK_BYTES) -> Iterator[ImportedHand]:
+    """Parse every hand in ``paths`` across a process pool; yields hands in file order.
+
+    ``workers=1`` parses in this process.
+    """
+    chunks = (chunk for path in paths for chunk in read_chunks(path, chunk_bytes))
+    if workers == 1:
+        for chunk in chunks:
+            yield from parse_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a couple of chunks per worker queued: enough to stay busy, not the whole file.
+        limit = 2 * (workers or os.cpu_count() or 1)
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parse_chunk, chunk))
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def import_file(path: str, workers: Optional[int] = None,
+                chunk_bytes: int = CHUNK_BYTES) -> Iterator[ImportedHand]:
+    return import_files([path], workers, chunk_bytes)
+
+
+def main():
+    hands = 0
+    actions = 0
+    for hand in import_files(sys.argv[1:]):
+        hands += 1
+        actions += len(hand.actions)
+    print(f"Parsed {hands} hands, {actions} actions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Preflop all-in equity between the 169 starting-hand classes.
+
+Two hole cards fall into one of 169 classes: 13 pairs, 78 suited and 78
+offsuit hands. A class index is ``high * 13 + low`` for suited hands and
+``low * 13 + high`` for offsuit ones (ranks as in cards.py), so pairs sit on
+the diagonal of a 13x13 grid.
+
+``build_matrix`` estimates the equity of every class against every other by
+sampling concrete combos and boards; ``write_matrix`` stores the result as a
+169x169 float16 matrix in ``preflop_equity.bin`` (about 57 KB) next to this
+module. ``preflop_equity`` answers lookups from that file:
+
+    python preflop.py [samples_per_matchup]   # regenerate the asset
+"""
+
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from cards import NUM_CARDS, NUM_RANKS, card_code, card_rank, card_suit
+from hand_evaluator import evaluate_batch
+
+NUM_CLASSES = NUM_RANKS * NUM_RANKS
+RANK_CHARS = "23456789TJQKA"
+
+MATRIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+MATRIX_MAGIC = b"PF16"
+MATRIX_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+HandClass = Union[int, str, Tuple[int, int]]
+
+_matrix: Optional[np.ndarray] = None
+
+
+def hand_class(card_a: int, card_b: int) -> int:
+    """Class index of two hole cards."""
+    high, low = sorted((card_rank(card_a), card_rank(card_b)), reverse=True)
+    if card_suit(card_a) == card_suit(card_b) and high != low:
+        return high * NUM_RANKS + low
+    return low * NUM_RANKS + high
+
+
+def class_name(index: int) -> str:
+    """Short name of a class: "AA", "AKs", "72o"."""
+    row, col = divmod(index, NUM_RANKS)
+    if row == col:
+        return RANK_CHARS[row] * 2
+    if row > col:
+        return RANK_CHARS[row] + RANK_CHARS[col] + "s"
+    return RANK_CHARS[col] + RANK_CHARS[row] + "o"
+
+
+def parse_class(name: str) -> int:
+    """Class index from a name like "QQ", "AKs" or "T9o"."""
+    name = name.strip()
+    if len(name) not in (2, 3) or name[0] not in RANK_CHARS or name[1] not in RANK_CHARS:
+        raise ValueError("not a starting hand: %r" % name)
+    high, low = sorted((RANK_CHARS.index(name[0]), RANK_CHARS.index(name[1])), reverse=True)
+    if high == low:
+        if len(name) == 3:
+            raise ValueError("pairs cannot be suited or offsuit: %r" % name)
+        return high * NUM_RANKS + low
+    if len(name) != 3 or name[2] not in "so":
+        raise ValueError("non-pairs need an 's' or 'o' suffix: %r" % name)
+    if name[2] == "s":
+        return high * NUM_RANKS + low
+    return low * NUM_RANKS + high
+
+
+def class_combos(index: int) -> List[Tuple[int, int]]:
+    """Every concrete pair of cards in a class (6 pairs, 4 suited or 12 offsuit)."""
+    row, col = divmod(index, NUM_RANKS)
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if row == col and s1 >= s2:
+                continue
+            if row > col and s1 != s2:
+                continue
+            if row < col and s1 == s2:
+                continue
+            combos.append((card_code(s1, row), card_code(s2, col)))
+    return combos
+
+
+def _matchup_equity(rng: np.random.Generator, combos_a: np.ndarray, combos_b: np.ndarray,
+                    samples: int) -> float:
+    """Sampled all-in equity of one class against another (ties count half)."""
+    holes_a = combos_a[rng.integers(0, len(combos_a), samples)]
+    holes_b = combos_b[rng.integers(0, len(combos_b), samples)]
+    hands = np.empty((samples, 9), dtype=np.intp)
+    hands[:, :2] = holes_a
+    hands[:, 2:4] = holes_b
+    hands[:, 4:] = rng.integers(0, NUM_CARDS, (samples, 5))
+    # Redraw rows where the two hands share a card or the board repeats one.
+    while True:
+        ordered = np.sort(hands, axis=1)
+        bad = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if not bad.size:
+            break
+        hands[bad, :2] = combos_a[rng.integers(0, len(combos_a), bad.size)]
+        hands[bad, 2:4] = combos_b[rng.integers(0, len(combos_b), bad.size)]
+        hands[bad, 4:] = rng.integers(0, NUM_CARDS, (bad.size, 5))
+
+    board = hands[:, 4:]
+    strength_a = evaluate_batch(np.concatenate([hands[:, :2], board], axis=1))
+    strength_b = evaluate_batch(np.concatenate([hands[:, 2:4], board], axis=1))
+    return float((strength_a > strength_b).mean() + 0.5 * (strength_a == strength_b).mean())
+
+
+def _matrix_row(index: int, samples: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Equity of class ``index`` against every class above it."""
+    rng = np.random.default_rng(seed)
+    row = np.full(NUM_CLASSES, np.nan)
+    combos_a = np.array(class_combos(index))
+    for other in range(index + 1, NUM_CLASSES):
+        row[other] = _matchup_equity(rng, combos_a, np.array(class_combos(other)), samples)
+    return row
+
+
+def build_matrix(samples: int = 20000, seed: int = 0, workers: Optional[int] = None) -> np.ndarray:
+    """Estimate the full 169x169 equity matrix; entry [a, b] is a's equity against b."""
+    seeds = np.random.SeedSequence(seed).spawn(NUM_CLASSES)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(_matrix_row, range(NUM_CLASSES), [samples] * NUM_CLASSES, seeds))
+    matrix = np.full((NUM_CLASSES, NUM_CLASSES), 0.5)
+    for a, row in enumerate(rows):
+        matrix[a, a + 1:] = row[a + 1:]
+        matrix[a + 1:, a] = 1.0 - row[a + 1:]
+    return matrix
+
+
+def write_matrix(matrix: np.ndarray, path: str = MATRIX_PATH):
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MATRIX_MAGIC, MATRIX_VERSION, NUM_CLASSES))
+        f.write(matrix.astype("<f2").tobytes())
+
+
+def load_matrix(path: str = MATRIX_PATH) -> np.ndarray:
+    """Read the float16 matrix written by ``write_matrix``."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, size = _HEADER.unpack_from(data, 0)
+    if magic != MATRIX_MAGIC or version != MATRIX_VERSION or size != NUM_CLASSES:
+        raise ValueError("%s is not a version %d preflop equity matrix" % (path, MATRIX_VERSION))
+    return np.frombuffer(data, dtype="<f2", offset=_HEADER.size).reshape(NUM_CLASSES, NUM_CLASSES)
+
+
+def _class_index(hand: HandClass) -> int:
+    if isinstance(hand, str):
+        return parse_class(hand)
+    if isinstance(hand, tuple):
+        return hand_class(*hand)
+    return hand
+
+
+def preflop_equity(hand_a: HandClass, hand_b: HandClass) -> float:
+    """All-in equity (0..1, ties half) of ``hand_a`` against ``hand_b``.
+
+    Hands may be class indices, names like "AKs", or (card, card) tuples.
+    """
+    global _matrix
+    if _matrix is None:
+        _matrix = load_matrix()
+    return float(_matrix[_class_index(hand_a), _class_index(hand_b)])
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    matrix = build_matrix(samples)
+    write_matrix(matrix)
+    print(f"Wrote {MATRIX_PATH} ({samples} samples per matchup)")
+
+
+if __name__ == '__main__':
+    main()
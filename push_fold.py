@@ -0,0 +1,177 @@
+"""Heads-up push/fold strategies solved by counterfactual regret minimization.
+
+The game: one unit of dead money in the pot and ``stack`` units behind for
+both players. The first player moves all-in or folds (gives up the pot);
+facing the shove the second player calls or folds. A called all-in is
+settled with the preflop equity matrix (preflop.py), and deals are weighted
+by how many card-disjoint combos each pair of classes has.
+
+``train`` runs CFR+ for every stack size in ``STACKS`` at once: regrets and
+average strategies are (stacks, 169) NumPy arrays and one iteration updates
+all of them with a few matrix products. ``write_table`` quantizes the
+average strategies to a byte per class and role in ``push_fold.bin`` (about
+4 KB) next to this module, and ``PushFoldTable`` answers lookups from it:
+
+    python push_fold.py [iterations]   # retrain the table
+
+AI seats play the table through ``bots.PushFoldBot``. The engine has no
+blinds, so an empty pot is looked up in the deepest row, the tightest ranges.
+"""
+
+import bisect
+import os
+import struct
+import sys
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from cards import NUM_CARDS
+from preflop import NUM_CLASSES, class_combos, hand_class, load_matrix
+
+# Stacks behind, in units of dead money, that strategies are solved for.
+STACKS = (1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0, 25.0)
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "push_fold.bin")
+TABLE_MAGIC = b"PFCF"
+TABLE_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+_table: Optional["PushFoldTable"] = None
+
+
+def matchup_weights() -> np.ndarray:
+    """(169, 169) number of combo pairs of two classes that share no card."""
+    combos = [(cls, combo) for cls in range(NUM_CLASSES) for combo in class_combos(cls)]
+    cards = np.zeros((len(combos), NUM_CARDS))
+    classes = np.zeros((len(combos), NUM_CLASSES))
+    for i, (cls, (a, b)) in enumerate(combos):
+        cards[i, a] = cards[i, b] = 1.0
+        classes[i, cls] = 1.0
+    disjoint = (cards @ cards.T == 0).astype(np.float64)
+    return classes.T @ disjoint @ classes
+
+
+def _values(weights: np.ndarray, equity: np.ndarray, stacks: np.ndarray,
+            push: np.ndarray, call: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Counterfactual values of shoving for the first player and of calling for
+    the second, each (stacks, 169); folding is worth 0 to both."""
+    pot = (2 * stacks + 1)[:, None]
+    shove = (1 - call) @ weights.T + pot * (call @ (weights * equity).T) - stacks[:, None] * (call @ weights.T)
+    called = pot * (push @ (weights * (1 - equity))) - stacks[:, None] * (push @ weights)
+    return shove, called
+
+
+def _regret_matching(positive: np.ndarray, negative: np.ndarray) -> np.ndarray:
+    total = positive + negative
+    return np.where(total > 0, positive / np.where(total > 0, total, 1), 0.5)
+
+
+def train(iterations: int = 2000, stacks: Sequence[float] = STACKS) -> Tuple[np.ndarray, np.ndarray]:
+    """Solve every stack size; returns the average (push, call) probabilities,
+    each a (len(stacks), 169) array indexed like preflop classes."""
+    weights = matchup_weights()
+    equity = load_matrix().astype(np.float64)
+    stacks = np.asarray(stacks, dtype=np.float64)
+    shape = (len(stacks), NUM_CLASSES)
+    # CFR+ regrets of the two actions at every information set
+    push_regret, pass_regret = np.zeros(shape), np.zeros(shape)
+    call_regret, fold_regret = np.zeros(shape), np.zeros(shape)
+    push_sum, call_sum = np.zeros(shape), np.zeros(shape)
+    call = np.full(shape, 0.5)
+    for t in range(1, iterations + 1):
+        # Alternating updates: the shover against the current calls, then the caller
+        push = _regret_matching(push_regret, pass_regret)
+        shove, _ = _values(weights, equity, stacks, push, call)
+        push_regret = np.maximum(push_regret + (1 - push) * shove, 0)
+        pass_regret = np.maximum(pass_regret - push * shove, 0)
+        push = _regret_matching(push_regret, pass_regret)
+        _, called = _values(weights, equity, stacks, push, call)
+        call_regret = np.maximum(call_regret + (1 - call) * called, 0)
+        fold_regret = np.maximum(fold_regret - call * called, 0)
+        call = _regret_matching(call_regret, fold_regret)
+        # Later iterations count more (linear averaging)
+        push_sum += t * push
+        call_sum += t * call
+    norm = iterations * (iterations + 1) / 2
+    return push_sum / norm, call_sum / norm
+
+
+def exploitability(push: np.ndarray, call: np.ndarray, stacks: Sequence[float] = STACKS) -> np.ndarray:
+    """Per stack size, what two best responses gain together against the
+    strategies, in units of dead money per deal (0 at an equilibrium)."""
+    weights = matchup_weights()
+    equity = load_matrix().astype(np.float64)
+    stacks = np.asarray(stacks, dtype=np.float64)
+    shove, called = _values(weights, equity, stacks, push, call)
+    deals = weights.sum()
+    shover = np.maximum(shove, 0).sum(axis=1)
+    caller = ((1 - push) @ weights).sum(axis=1) + np.maximum(called, 0).sum(axis=1)
+    # The two players' values always add up to the one unit in the pot.
+    return (shover + caller) / deals - 1
+
+
+def write_table(push: np.ndarray, call: np.ndarray, stacks: Sequence[float] = STACKS,
+                path: str = TABLE_PATH):
+    """Store strategies as one byte (probability * 255) per stack, role and class."""
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(stacks)))
+        f.write(np.asarray(stacks, dtype="<f4").tobytes())
+        for strategy in (push, call):
+            f.write(np.round(strategy * 255).astype(np.uint8).tobytes())
+
+
+class PushFoldTable:
+    """Push and call probabilities per stack size and preflop class."""
+
+    def __init__(self, stacks: Sequence[float], push: np.ndarray, call: np.ndarray):
+        self.stacks = list(stacks)
+        self.push = push
+        self.call = call
+
+    @property
+    def max_stack(self) -> float:
+        return self.stacks[-1]
+
+    def _row(self, stack: float) -> int:
+        """Row of the largest solved stack size not above ``stack`` (row 0 below all)."""
+        return max(bisect.bisect_right(self.stacks, stack) - 1, 0)
+
+    def push_probability(self, stack: float, hole: Sequence[int]) -> float:
+        return float(self.push[self._row(stack), hand_class(*hole)])
+
+    def call_probability(self, stack: float, hole: Sequence[int]) -> float:
+        return float(self.call[self._row(stack), hand_class(*hole)])
+
+
+def load_table(path: str = TABLE_PATH) -> PushFoldTable:
+    """Read a table written by ``write_table``."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        raise ValueError("%s is not a version %d push/fold table" % (path, TABLE_VERSION))
+    stacks = np.frombuffer(data, dtype="<f4", count=count, offset=_HEADER.size)
+    strategies = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size + 4 * count)
+    strategies = strategies.reshape(2, count, NUM_CLASSES) / 255.0
+    return PushFoldTable(stacks.tolist(), strategies[0], strategies[1])
+
+
+def default_table() -> PushFoldTable:
+    """The table shipped in ``push_fold.bin``, loaded once."""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    push, call = train(iterations)
+    write_table(push, call)
+    worst = float(exploitability(push, call).max())
+    print(f"Wrote {TABLE_PATH} ({iterations} iterations, exploitability <= {worst:.5f} per deal)")
+
+
+if __name__ == '__main__':
+    main()
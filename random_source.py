@@ -0,0 +1,79 @@
+"""Seedable, splittable random numbers for deals and bots.
+
+A ``RandomSource`` is one NumPy PCG64 stream whose floats are generated in
+blocks of ``buffer_size`` and handed out one at a time, so it can stand in for
+the ``random`` module wherever the engine or a bot draws (``random``,
+``randint``, ``choice``). Streams split without correlation through NumPy's
+``SeedSequence``: ``substream(key)`` is the same stream for the same root seed
+and key no matter which process asks for it, so a simulation can give every
+hand its own stream and any hand can be dealt again exactly:
+
+    root = RandomSource(42)
+    deck = Deck(root.substream(hand_number))
+
+``POKER_SEED`` fixes the seed of the interactive front ends.
+"""
+
+import os
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+BUFFER_SIZE = 1024
+# First spawn-key word of every substream, so that keyed substreams never
+# coincide with the numbered children ``spawn`` hands out.
+_SUBSTREAM_TAG = 0x53554253  # b"SUBS"
+
+Seed = Union[None, int, np.random.SeedSequence]
+
+
+def default_seed() -> Optional[int]:
+    """The seed in $POKER_SEED, or None for a fresh one."""
+    seed = os.environ.get("POKER_SEED")
+    return int(seed) if seed else None
+
+
+class RandomSource:
+    """Uniform random numbers from one PCG64 stream, generated in bulk."""
+
+    def __init__(self, seed: Seed = None, buffer_size: int = BUFFER_SIZE):
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.buffer_size = buffer_size
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self._buffer: List[float] = []
+        self._pos = 0
+
+    @property
+    def entropy(self) -> int:
+        """The root seed; ``RandomSource(entropy)`` starts the same streams again."""
+        return self.seed_sequence.entropy
+
+    def random(self) -> float:
+        """A float in [0, 1)."""
+        if self._pos == len(self._buffer):
+            self._buffer = self.generator.random(self.buffer_size).tolist()
+            self._pos = 0
+        x = self._buffer[self._pos]
+        self._pos += 1
+        return x
+
+    def randint(self, a: int, b: int) -> int:
+        """An int in [a, b], like ``random.randint``."""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq: Sequence):
+        return seq[int(self.random() * len(seq))]
+
+    def substream(self, *key: int) -> "RandomSource":
+        """The independent stream at ``key`` (worker, table, hand number...)
+        below this one."""
+        seq = self.seed_sequence
+        spawn_key = seq.spawn_key + (_SUBSTREAM_TAG,) + key
+        return RandomSource(np.random.SeedSequence(seq.entropy, spawn_key=spawn_key), self.buffer_size)
+
+    def spawn(self, n: int) -> List["RandomSource"]:
+        """``n`` new independent streams, e.g. one per worker; unlike
+        ``substream`` every call gives different ones."""
+        return [RandomSource(child, self.buffer_size) for child in self.seed_sequence.spawn(n)]
@@ -0,0 +1,158 @@
+"""Event-sourced table state: an append-only event log plus periodic snapshots.
+
+``SessionLog`` is an ``EngineListener`` that writes every state transition of
+a table to ``events-<generation>.log`` in a session directory:
+
+    HAND_START  byte 1, varint stack per seat, 52 bytes of deck order
+    ACTION      byte 2, byte seat, byte action (index into ACTIONS),
+                varint raise-to amount (0 unless RAISE)
+    HAND_END    byte 3
+
+Every ``snapshot_every`` hands the full engine state (``get_state``) is saved
+to ``snapshot.json`` with the next generation number and a new, empty event
+log is started, so a restart reads one small snapshot plus a short tail:
+
+    log = SessionLog("session/")
+    log.restore(engine)            # back to where the last run stopped
+    engine.listeners.append(log)
+
+Events are flushed as they are written; a table that crashes mid-hand comes
+back mid-hand, with the same cards still to come.
+"""
+
+import json
+import os
+from typing import Optional
+
+from hand_history import read_varint, write_varint
+from poker_engine import ACTIONS, NUM_SEATS, RAISE, EngineListener, PokerEngine
+
+HAND_START = 1
+ACTION = 2
+HAND_END = 3
+
+SNAPSHOT_EVERY = 50
+SNAPSHOT = "snapshot.json"
+
+_ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+class SessionLog(EngineListener):
+    """Writes a table's events to ``session_dir`` and restores the table from it."""
+
+    def __init__(self, session_dir: str, snapshot_every: int = SNAPSHOT_EVERY):
+        os.makedirs(session_dir, exist_ok=True)
+        self.session_dir = session_dir
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        self.hands = 0
+        snapshot = self._load_snapshot()
+        if snapshot:
+            self.generation = snapshot["generation"]
+            self.hands = snapshot["hands"]
+        self._file = open(self._log_path(self.generation), "ab")
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.session_dir, "events-%06d.log" % generation)
+
+    def _load_snapshot(self) -> Optional[dict]:
+        path = os.path.join(self.session_dir, SNAPSHOT)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _append(self, event: bytes):
+        self._file.write(event)
+        self._file.flush()
+
+    def hand_started(self, engine: PokerEngine):
+        event = bytearray([HAND_START])
+        for stack in engine.starting_stacks:
+            write_varint(event, stack)
+        event += bytes(engine.deck.cards)
+        self._append(event)
+
+    def action(self, engine: PokerEngine, street: int, seat: int, action: str, paid: int):
+        event = bytearray([ACTION, seat, _ACTION_CODES[action]])
+        write_varint(event, engine.betOn if action == RAISE else 0)
+        self._append(event)
+
+    def hand_finished(self, engine: PokerEngine):
+        self._append(bytes([HAND_END]))
+        self.hands += 1
+        if self.hands % self.snapshot_every == 0:
+            self.snapshot(engine)
+
+    def snapshot(self, engine: PokerEngine):
+        """Save the engine state and start an empty event log after it."""
+        state = {"generation": self.generation + 1, "hands": self.hands, "engine": engine.get_state()}
+        path = os.path.join(self.session_dir, SNAPSHOT)
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        # From here on the snapshot alone describes everything before the new log.
+        self._file.close()
+        old = self._log_path(self.generation)
+        self.generation += 1
+        self._file = open(self._log_path(self.generation), "ab")
+        os.remove(old)
+
+    def _read_events(self):
+        """Parse the current log; a torn event at the end (crash mid-write) is cut off."""
+        with open(self._log_path(self.generation), "rb") as f:
+            data = f.read()
+        events = []
+        pos = 0
+        try:
+            while pos < len(data):
+                kind = data[pos]
+                if kind == HAND_START:
+                    stacks = []
+                    end = pos + 1
+                    for _ in range(NUM_SEATS):
+                        stack, end = read_varint(data, end)
+                        stacks.append(stack)
+                    if end + 52 > len(data):
+                        break
+                    events.append((kind, stacks, list(data[end:end + 52])))
+                    end += 52
+                elif kind == ACTION:
+                    amount, end = read_varint(data, pos + 3)
+                    events.append((kind, data[pos + 1], ACTIONS[data[pos + 2]], amount))
+                elif kind == HAND_END:
+                    events.append((kind,))
+                    end = pos + 1
+                else:
+                    raise ValueError(f"unknown event type {kind} in {self._log_path(self.generation)}")
+                pos = end
+        except IndexError:
+            pass
+        if pos < len(data):
+            self._file.truncate(pos)
+        return events
+
+    def restore(self, engine: PokerEngine) -> bool:
+        """Rebuild the table from the snapshot and the event tail after it.
+        Call before attaching this log to the engine. Returns False if there was
+        nothing to restore."""
+        snapshot = self._load_snapshot()
+        if snapshot:
+            engine.set_state(snapshot["engine"])
+        events = self._read_events()
+        for event in events:
+            if event[0] == HAND_START:
+                for p, stack in zip(engine.players, event[1]):
+                    p.money = stack
+                engine.reset(event[2])
+            elif event[0] == ACTION:
+                _, seat, action, amount = event
+                if engine.current_player != seat:
+                    raise ValueError(f"event log is out of step: seat {seat} acted for {engine.current_player}")
+                engine.apply(action, amount)
+            else:
+                self.hands += 1
+        return bool(snapshot) or bool(events)
+
+    def close(self):
+        self._file.close()
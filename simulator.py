@@ -0,0 +1,168 @@
+"""Self-play simulation: many independent hands across a process pool.
+
+Every hand is played by bots on a fresh ``PokerEngine`` table with the usual
+six-seat rules. Stacks are reset to the configured amount before each hand,
+so the chip delta of a seat in a hand is exactly what it won or lost there,
+and hands can be split across workers in any way.
+
+    result = simulate(1_000_000, TableConfig(), bots=[MyBot()] + [HeuristicBot()] * 5)
+
+Seats are played by picklable ``bots.Bot`` objects, or by ``BotRunner``s when a
+bot needs a per-decision time budget. Decision latencies are collected per
+seat and reported with the results. With ``history_path`` every hand is also
+appended to a binary hand-history file (see hand_history.py), in hand order.
+
+Every hand draws its cards and its bots' random numbers from its own
+``RandomSource`` substream (root seed, hand number), so results do not depend
+on the number of workers and ``simulate_hand`` deals any hand of a run again.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from bots import Bot, BotRunner, HeuristicBot, LatencyHistogram
+from hand_history import HandHistoryWriter, HandRecord, encode_hand
+from poker_engine import NUM_SEATS, STARTING_MONEY, PokerEngine
+from random_source import RandomSource
+
+Seat = Union[Bot, BotRunner]
+
+# Hands per task sent to a worker: large enough to amortize pickling, small
+# enough to stream results back steadily.
+CHUNK_SIZE = 2000
+# Floats generated at a time for one hand's stream: about what a hand uses.
+HAND_BUFFER = 64
+
+
+class TableConfig:
+    """Seat names and the stack every seat starts each simulated hand with."""
+
+    def __init__(self, names: Optional[List[str]] = None, money: int = STARTING_MONEY):
+        self.names = names or [f"Seat {i}" for i in range(NUM_SEATS)]
+        self.money = money
+
+
+def _seat_runners(bots: Sequence[Seat]) -> List[BotRunner]:
+    """A new runner per seat, so every chunk counts its own decisions per seat
+    even when one ``BotRunner`` is passed for several seats or several chunks."""
+    return [BotRunner(b.bot, b.budget) if isinstance(b, BotRunner) else BotRunner(b) for b in bots]
+
+
+def _play_hand(engine: PokerEngine, runners: Sequence[BotRunner], money: int, rng: RandomSource):
+    engine.deck.rng = rng
+    for r in runners:
+        r.bot.reseed(rng)
+    for p in engine.players:
+        p.money = money
+    engine.reset()
+    while not engine.is_terminal():
+        engine.apply(*runners[engine.current_player].decide(engine))
+
+
+def _play_chunk(num_hands: int, first_hand: int, config: TableConfig, bots: Sequence[Seat], seed: int,
+                record: bool = False) -> Tuple[np.ndarray, List[LatencyHistogram], bytes]:
+    """Play hands ``first_hand`` to ``first_hand + num_hands - 1`` of the run with
+    root seed ``seed``; returns an (num_hands, seats) array of chip deltas, each
+    seat's decision latencies and, if ``record``, the encoded hand histories."""
+    root = RandomSource(seed, HAND_BUFFER)
+    runners = _seat_runners(bots)
+    engine = PokerEngine(config.names, config.money)
+    deltas = np.empty((num_hands, NUM_SEATS), dtype=np.int32)
+    encoded = bytearray()
+    for h in range(num_hands):
+        _play_hand(engine, runners, config.money, root.substream(first_hand + h))
+        for seat, p in enumerate(engine.players):
+            deltas[h, seat] = p.money - config.money
+        if record:
+            encoded += encode_hand(HandRecord.from_engine(engine))
+    for r in runners:
+        r.close()
+    return deltas, [r.latency for r in runners], bytes(encoded)
+
+
+def _table(table_config: Optional[TableConfig], bots: Optional[Sequence[Seat]]) -> Tuple[TableConfig, List[Seat]]:
+    bots = list(bots or [HeuristicBot() for _ in range(NUM_SEATS)])
+    if len(bots) != NUM_SEATS:
+        raise ValueError(f"need one bot per seat ({NUM_SEATS}), got {len(bots)}")
+    return table_config or TableConfig(), bots
+
+
+def _run_chunks(num_hands: int, table_config: Optional[TableConfig], bots: Optional[Sequence[Seat]],
+                workers: Optional[int], seed: int,
+                record: bool = False) -> Iterator[Tuple[np.ndarray, List[LatencyHistogram], bytes]]:
+    config, bots = _table(table_config, bots)
+    starts = list(range(0, num_hands, CHUNK_SIZE))
+    sizes = [min(CHUNK_SIZE, num_hands - start) for start in starts]
+    n = len(sizes)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n == 1:
+        for size, start in zip(sizes, starts):
+            yield _play_chunk(size, start, config, bots, seed, record)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_play_chunk, sizes, starts, [config] * n, [bots] * n, [seed] * n, [record] * n)
+
+
+def simulate_chunks(num_hands: int, table_config: Optional[TableConfig] = None,
+                    bots: Optional[Sequence[Seat]] = None, workers: Optional[int] = None,
+                    seed: Optional[int] = None) -> Iterator[np.ndarray]:
+    """Yield per-hand chip deltas, one (hands, seats) array per finished chunk, in order."""
+    seed = RandomSource(seed).entropy
+    for deltas, _, _ in _run_chunks(num_hands, table_config, bots, workers, seed):
+        yield deltas
+
+
+def simulate(num_hands: int, table_config: Optional[TableConfig] = None,
+             bots: Optional[Sequence[Seat]] = None, workers: Optional[int] = None,
+             seed: Optional[int] = None, history_path: Optional[str] = None) -> Dict[str, list]:
+    """Play ``num_hands`` hands and total the results per seat.
+
+    Returns a dict with "hands", "chip_deltas" (net chips per seat),
+    "mean_delta" (chips per hand), "stddev" (per-hand spread), "latency"
+    (a ``LatencyHistogram.summary`` per seat) and "seed" (the root seed, also
+    when none was given, for ``simulate_hand``).
+    """
+    seed = RandomSource(seed).entropy
+    hands = 0
+    totals = np.zeros(NUM_SEATS, dtype=np.int64)
+    squares = np.zeros(NUM_SEATS, dtype=np.float64)
+    latency = [LatencyHistogram() for _ in range(NUM_SEATS)]
+    history = HandHistoryWriter(history_path) if history_path else None
+    for deltas, histograms, encoded in _run_chunks(num_hands, table_config, bots, workers, seed,
+                                                   history is not None):
+        if history:
+            history.write_encoded(encoded, len(deltas))
+        for total, part in zip(latency, histograms):
+            total.merge(part)
+        hands += len(deltas)
+        totals += deltas.sum(axis=0)
+        squares += np.square(deltas, dtype=np.float64).sum(axis=0)
+    if history:
+        history.close()
+    means = totals / max(hands, 1)
+    variances = np.maximum(squares / max(hands, 1) - np.square(means), 0.0)
+    return {
+        "hands": hands,
+        "chip_deltas": totals.tolist(),
+        "mean_delta": means.tolist(),
+        "stddev": np.sqrt(variances).tolist(),
+        "latency": [h.summary() for h in latency],
+        "seed": seed,
+    }
+
+
+def simulate_hand(hand_number: int, seed: int, table_config: Optional[TableConfig] = None,
+                  bots: Optional[Sequence[Seat]] = None) -> PokerEngine:
+    """Deal and play hand ``hand_number`` (counting from 0) of the run with root
+    seed ``seed`` again, with the same table and bots; returns the finished table."""
+    config, bots = _table(table_config, bots)
+    runners = _seat_runners(bots)
+    engine = PokerEngine(config.names, config.money)
+    _play_hand(engine, runners, config.money, RandomSource(seed, HAND_BUFFER).substream(hand_number))
+    for r in runners:
+        r.close()
+    return engine
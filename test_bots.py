@@ -0,0 +1,44 @@
+"""BotRunner falls back to the default action when a bot fails."""
+
+import time
+
+import pytest
+
+from bots import Bot, BotRunner
+from poker_engine import CHECK_CALL, FOLD, RAISE, PokerEngine
+
+
+class BrokenBot(Bot):
+    name = "broken"
+
+    def act(self, obs):
+        raise RuntimeError("bug in the bot")
+
+
+def table(bet: int = 0) -> PokerEngine:
+    engine = PokerEngine(rng=1)
+    engine.reset()
+    if bet:
+        engine.apply(RAISE, bet)
+    return engine
+
+
+@pytest.mark.parametrize("budget", [None, 1.0])
+def test_decide_survives_a_raising_bot(budget):
+    runner = BotRunner(BrokenBot(), budget=budget)
+    assert runner.decide(table()) == (CHECK_CALL, 0)
+    assert runner.decide(table(bet=50)) == (FOLD, 0)
+    assert runner.latency.errors == 2
+    assert runner.latency.summary()["errors"] == 2
+    runner.close()
+
+
+def test_started_decision_survives_a_raising_bot():
+    runner = BotRunner(BrokenBot(), budget=1.0)
+    decision = runner.start(table(bet=50))
+    while not decision.ready():
+        time.sleep(0.001)
+    assert decision.action() == (FOLD, 0)
+    assert runner.latency.errors == 1
+    assert runner.latency.timeouts == 0
+    runner.close()
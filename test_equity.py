@@ -0,0 +1,34 @@
+"""Equity shares of split pots."""
+
+import pytest
+
+from cards import card_code
+from equity import calculate_equity, exact_equity
+
+SPADES, HEARTS, CLUBS, DIAMONDS = 1, 2, 3, 0
+
+
+def test_board_plays_splits_three_ways():
+    royal = [card_code(SPADES, r) for r in (12, 11, 10, 9, 8)]
+    holes = [[card_code(HEARTS, 0), card_code(CLUBS, 1)],
+             [card_code(HEARTS, 2), card_code(CLUBS, 3)],
+             [card_code(DIAMONDS, 4), card_code(CLUBS, 5)]]
+    for result in exact_equity(holes, royal):
+        assert result["tie"] == pytest.approx(100.0)
+        assert result["equity"] == pytest.approx(100.0 / 3)
+
+
+@pytest.mark.parametrize("board", [[], [card_code(SPADES, 3), card_code(HEARTS, 3), card_code(CLUBS, 7)]])
+def test_equities_add_up_to_the_pot(board):
+    # Three small hands that often chop
+    holes = [[card_code(SPADES, 0), card_code(HEARTS, 1)],
+             [card_code(CLUBS, 0), card_code(DIAMONDS, 1)],
+             [card_code(HEARTS, 0), card_code(CLUBS, 1)]]
+    sampled = calculate_equity(holes, board, iterations=20000, workers=1, seed=1)
+    assert sum(r["equity"] for r in sampled) == pytest.approx(100.0)
+    assert all(r["tie"] > 10 for r in sampled)
+    if board:
+        exact = exact_equity(holes, board)
+        assert sum(r["equity"] for r in exact) == pytest.approx(100.0)
+        for s, e in zip(sampled, exact):
+            assert s["equity"] == pytest.approx(e["equity"], abs=1.5)
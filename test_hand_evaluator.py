@@ -0,0 +1,111 @@
+"""The lookup evaluator against ``reference_score`` on random and edge-case hands.
+
+    python -m pytest -q
+"""
+
+import random
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from cards import NUM_CARDS, card_code, card_rank, card_suit
+from hand_evaluator import (MAX_STRENGTH, evaluate5, evaluate7, evaluate_batch,
+                            hand_category, reference_score)
+
+DIAMONDS, SPADES, HEARTS, CLUBS = range(4)
+
+
+def reference(cards):
+    ranks = sorted((card_rank(c) for c in cards), reverse=True)
+    return reference_score(ranks, len({card_suit(c) for c in cards}) == 1)
+
+
+def reference7(cards):
+    return max(reference(hand) for hand in combinations(cards, 5))
+
+
+def sign(x):
+    return (x > 0) - (x < 0)
+
+
+def assert_same_order(hands, strengths, scores):
+    """Strengths order the hands exactly as the reference scores do, ties included."""
+    order = sorted(range(len(hands)), key=lambda i: scores[i])
+    for i, j in zip(order, order[1:]):
+        a, b = scores[i], scores[j]
+        assert sign(strengths[j] - strengths[i]) == (b > a) - (b < a), (hands[i], hands[j])
+
+
+@pytest.fixture
+def rng():
+    return random.Random(7462)
+
+
+def test_evaluate5_orders_like_reference(rng):
+    hands = [rng.sample(range(NUM_CARDS), 5) for _ in range(3000)]
+    strengths = [evaluate5(*hand) for hand in hands]
+    scores = [reference(hand) for hand in hands]
+    assert all(1 <= s <= MAX_STRENGTH for s in strengths)
+    for s, r in zip(strengths, scores):
+        assert hand_category(s) == r[0]
+    assert_same_order(hands, strengths, scores)
+
+
+def test_evaluate7_is_best_five(rng):
+    hands = [rng.sample(range(NUM_CARDS), 7) for _ in range(1000)]
+    strengths = [evaluate7(hand) for hand in hands]
+    for hand, s in zip(hands, strengths):
+        assert s == max(evaluate5(*five) for five in combinations(hand, 5))
+    assert_same_order(hands, strengths, [reference7(hand) for hand in hands])
+
+
+def test_evaluate_batch_matches_evaluate7(rng):
+    hands = np.array([rng.sample(range(NUM_CARDS), 7) for _ in range(5000)])
+    batch = evaluate_batch(hands)
+    assert batch.tolist() == [evaluate7(hand) for hand in hands.tolist()]
+
+
+def test_evaluate_batch_rejects_bad_shape():
+    with pytest.raises(ValueError):
+        evaluate_batch(np.zeros((3, 5), dtype=np.intp))
+
+
+def hand(*cards):
+    return [card_code(suit, rank) for suit, rank in cards]
+
+
+def test_wheel_is_the_lowest_straight():
+    wheel = hand((DIAMONDS, 12), (SPADES, 3), (HEARTS, 2), (CLUBS, 1), (DIAMONDS, 0))
+    six_high = hand((DIAMONDS, 4), (SPADES, 3), (HEARTS, 2), (CLUBS, 1), (DIAMONDS, 0))
+    trips = hand((DIAMONDS, 12), (SPADES, 12), (HEARTS, 12), (CLUBS, 11), (DIAMONDS, 10))
+    assert reference(wheel) == (4, 3)
+    assert hand_category(evaluate5(*wheel)) == 4
+    assert evaluate5(*trips) < evaluate5(*wheel) < evaluate5(*six_high)
+
+
+def test_steel_wheel_and_royal_flush():
+    steel = hand(*((SPADES, r) for r in (12, 3, 2, 1, 0)))
+    six_high = hand(*((SPADES, r) for r in (4, 3, 2, 1, 0)))
+    royal = hand(*((HEARTS, r) for r in (12, 11, 10, 9, 8)))
+    quads = hand((DIAMONDS, 12), (SPADES, 12), (HEARTS, 12), (CLUBS, 12), (DIAMONDS, 11))
+    assert reference(steel) == (8, 3)
+    assert evaluate5(*quads) < evaluate5(*steel) < evaluate5(*six_high) < evaluate5(*royal)
+    assert evaluate5(*royal) == MAX_STRENGTH
+
+
+def test_seven_card_flushes():
+    # Six spades: the flush is the best five of them, not a lower straight
+    flush = hand(*((SPADES, r) for r in (12, 10, 8, 6, 4, 2))) + hand((HEARTS, 11))
+    assert hand_category(evaluate7(flush)) == 5
+    assert evaluate7(flush) == evaluate5(*flush[:5])
+    # A straight flush hidden among a bigger plain straight
+    straight_flush = hand(*((CLUBS, r) for r in (6, 5, 4, 3, 2))) + hand((HEARTS, 8), (DIAMONDS, 7))
+    assert hand_category(evaluate7(straight_flush)) == 8
+    assert evaluate7(straight_flush) == evaluate5(*straight_flush[:5])
+    # Wheel straight flush in seven cards
+    wheel_flush = hand(*((DIAMONDS, r) for r in (12, 3, 2, 1, 0))) + hand((SPADES, 12), (HEARTS, 12))
+    assert reference7(wheel_flush) == (8, 3)
+    assert hand_category(evaluate7(wheel_flush)) == 8
+    cards = np.array([flush, straight_flush, wheel_flush])
+    assert evaluate_batch(cards).tolist() == [evaluate7(h) for h in cards.tolist()]
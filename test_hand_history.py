@@ -0,0 +1,106 @@
+"""Engine hand -> encode_hand -> decode_hand -> replay_hand round trips."""
+
+import random
+
+import pytest
+
+from hand_history import (HandHistoryWriter, HandRecord, ReplayError, decode_hand, encode_hand,
+                          read_hands, read_varint, replay_hand)
+from poker_engine import (ALL_IN, CHECK_CALL, FLOP, FOLD, PREFLOP, RAISE, SHOWDOWN, PokerEngine,
+                          heuristic_action)
+
+
+def play(stacks, script, seed=1):
+    """Deal a hand with the given stacks, play ``script`` and check/call the rest."""
+    engine = PokerEngine(rng=seed)
+    for p, stack in zip(engine.players, stacks):
+        p.money = stack
+    engine.reset()
+    for action, amount in script:
+        engine.apply(action, amount)
+    while not engine.is_terminal():
+        engine.apply(CHECK_CALL if CHECK_CALL in engine.legal_actions() else ALL_IN)
+    return engine
+
+
+def round_trip(engine):
+    record = HandRecord.from_engine(engine)
+    data = encode_hand(record)
+    length, start = read_varint(data, 0)
+    assert start + length == len(data)
+    decoded = decode_hand(data, start)
+    assert decoded == record
+    replayed = replay_hand(decoded)
+    assert [p.money for p in replayed.players] == [p.money for p in engine.players]
+    assert replayed.tableCards == engine.tableCards
+    return decoded
+
+
+def test_raises_and_short_all_in_to_showdown():
+    engine = play([1000, 30, 1000, 500, 1000, 1000], [
+        (RAISE, 50), (ALL_IN, 0), (RAISE, 120), (CHECK_CALL, 0), (FOLD, 0), (FOLD, 0),
+        (RAISE, 300), (FOLD, 0), (CHECK_CALL, 0),  # seat 3 calls 300 with 380 left
+        (RAISE, 40), (ALL_IN, 0),
+    ])
+    record = round_trip(engine)
+    assert engine.street == SHOWDOWN
+    assert (PREFLOP, 1, ALL_IN, 30) in record.actions
+    assert (FLOP, 3, ALL_IN, 80) in record.actions
+    assert len(record.board) == 5
+
+
+def test_hand_over_before_the_flop():
+    engine = play([1000] * 6, [(RAISE, 40)] + [(FOLD, 0)] * 5)
+    record = round_trip(engine)
+    assert record.board == ()
+    assert record.awards == ((0, 40),)
+
+
+def test_hand_over_on_the_flop():
+    engine = play([1000, 0, 1000, 0, 1000, 1000], [(CHECK_CALL, 0)] * 4 + [(RAISE, 100)] + [(FOLD, 0)] * 3)
+    record = round_trip(engine)
+    assert engine.street == FLOP
+    assert len(record.board) == 3
+    assert record.holes[1] == record.holes[3] == ()
+
+
+def test_all_in_preflop_runs_out_the_board():
+    engine = play([500, 200, 0, 0, 0, 0], [(ALL_IN, 0), (ALL_IN, 0)])
+    record = round_trip(engine)
+    assert record.actions == ((PREFLOP, 0, ALL_IN, 500), (PREFLOP, 1, ALL_IN, 200))
+    assert len(record.board) == 5
+    assert engine.street == SHOWDOWN
+
+
+def test_self_play_through_a_file(tmp_path):
+    rng = random.Random(13)
+    engine = PokerEngine(rng=13)
+    path = str(tmp_path / "hands.bin")
+    played = []
+    with HandHistoryWriter(path, flush_bytes=64) as writer:
+        for _ in range(300):
+            if engine.players_with_money() < 2:
+                for p in engine.players:
+                    p.money = rng.randint(1, 2000)
+            engine.reset()
+            while not engine.is_terminal():
+                engine.apply(*heuristic_action(engine, rng))
+            writer.write_engine(engine)
+            played.append(HandRecord.from_engine(engine))
+    records = list(read_hands(path))
+    assert records == played
+    streets = set()
+    for record in records:
+        final = replay_hand(record)
+        streets.add(final.street)
+    assert streets >= {PREFLOP, SHOWDOWN}
+
+
+def test_replay_rejects_a_changed_record():
+    engine = play([1000] * 6, [(RAISE, 40)] + [(FOLD, 0)] * 5)
+    record = HandRecord.from_engine(engine)
+    with pytest.raises(ReplayError):
+        replay_hand(record._replace(awards=((1, 40),)))
+    street, seat, action, paid = record.actions[0]
+    with pytest.raises(ReplayError):
+        replay_hand(record._replace(actions=((street, seat + 1, action, paid),) + record.actions[1:]))
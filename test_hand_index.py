@@ -0,0 +1,78 @@
+"""Index queries against a brute-force scan of the hand history."""
+
+import pytest
+
+import hand_index
+from hand_evaluator import evaluate7, hand_name
+from hand_history import read_hand_at, scan_hands
+from hand_index import HandIndex, board_textures, update_index
+from poker_engine import FOLD
+from preflop import class_name, hand_class
+from simulator import simulate
+
+
+@pytest.fixture
+def indexed(tmp_path, monkeypatch):
+    """Three batches of hands, indexed after each; the third update merges segments."""
+    monkeypatch.setattr(hand_index, "MAX_SEGMENTS", 2)
+    history = str(tmp_path / "hands.bin")
+    index_dir = str(tmp_path / "index")
+    for seed in (1, 2, 3):
+        simulate(150, workers=1, seed=seed, history_path=history)
+        assert update_index(history, index_dir) == 150
+    assert update_index(history, index_dir) == 0
+    index = HandIndex(index_dir)
+    assert len(index.segments) == 1
+    return history, index
+
+
+def matches(record, player=None, hole=None, board=None, category=None, result=None):
+    """The ``HandIndex.find`` fields checked on one hand directly."""
+    if board and board not in board_textures(record.board):
+        return False
+    folded = {seat for _, seat, action, _ in record.actions if action == FOLD}
+    dealt = [seat for seat, cards in enumerate(record.holes) if cards]
+    live = [seat for seat in dealt if seat not in folded]
+    showdown = len(live) > 1 and len(record.board) == 5
+    if player:
+        dealt = [seat for seat in dealt if f"Player {seat + 1}" == player]
+        if not dealt:
+            return False
+        if result and (result == "won") != any(seat == dealt[0] for seat, _ in record.awards):
+            return False
+    if hole and not any(class_name(hand_class(*record.holes[seat])) == hole for seat in dealt):
+        return False
+    if category:
+        shown = [hand_name(evaluate7(list(record.holes[seat]) + list(record.board)))
+                 for seat in dealt if showdown and seat in live]
+        if category not in shown:
+            return False
+    return True
+
+
+QUERIES = [
+    dict(player="Player 1"),
+    dict(player="Player 2", result="won"),
+    dict(player="Player 3", result="lost"),
+    dict(hole="AKo"),
+    dict(category="Flush"),
+    dict(player="Player 4", category="Two Pair", result="won"),
+    dict(board="monotone"),
+    dict(board="paired", category="Full House"),
+    dict(player="Player 5", hole="A9o", board="rainbow"),
+]
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=lambda q: ",".join(f"{k}={v}" for k, v in q.items()))
+def test_find_matches_a_scan(indexed, query):
+    history, index = indexed
+    expected = [offset for offset, record in scan_hands(history) if matches(record, **query)]
+    found = index.find(**query).tolist()
+    assert found == expected
+    for offset in found[:3]:
+        assert matches(read_hand_at(history, offset), **query)
+
+
+def test_every_query_above_has_hits(indexed):
+    _, index = indexed
+    assert all(len(index.find(**query)) for query in QUERIES)
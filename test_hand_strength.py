@@ -0,0 +1,65 @@
+"""Hand strength table and cache against exact strengths."""
+
+import random
+import threading
+
+import numpy as np
+
+from hand_strength import (NO_DATA, TABLE_STREETS, StrengthCache, board_bucket, board_buckets,
+                           default_table, postflop_strength)
+from preflop import hand_class
+
+
+def test_scalar_bucket_matches_batch():
+    rng = np.random.default_rng(22)
+    for size in (3, 4, 5):
+        cards = np.argsort(rng.random((3000, 52)), axis=1)[:, :2 + size]
+        batch = board_buckets(cards[:, :2], cards[:, 2:])
+        assert batch.tolist() == [board_bucket(c[:2], c[2:]) for c in cards.tolist()]
+
+
+def test_table_is_close_to_exact():
+    rng = random.Random(22)
+    table = default_table()
+    for street, size in enumerate(TABLE_STREETS):
+        errors = []
+        for _ in range(150):
+            cards = rng.sample(range(52), 2 + size)
+            hole, board = cards[:2], cards[2:]
+            cell = table[street, hand_class(*hole), board_bucket(hole, board)]
+            if cell != NO_DATA:
+                errors.append(abs(cell / 254.0 - postflop_strength(hole, board)))
+        assert len(errors) > 140
+        assert np.mean(errors) < 0.04
+
+
+def test_river_is_exact_and_cached():
+    cache = StrengthCache()
+    hole, board = [0, 13], [26, 39, 5, 18, 31]
+    exact = postflop_strength(hole, board)
+    assert cache.strength(hole, board) == exact
+    assert cache.strength([13, 0], list(reversed(board))) == exact
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_shared_between_threads():
+    cache = StrengthCache(max_bytes=20 * 240)
+    rng = random.Random(7)
+    spots = [rng.sample(range(52), 7) for _ in range(60)]
+    errors = []
+
+    def work():
+        try:
+            for cards in spots:
+                cache.strength(cards[:2], cards[2:])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(cache) <= 20
+    assert cache.hits + cache.misses == 4 * len(spots)
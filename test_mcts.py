@@ -0,0 +1,74 @@
+"""MCTS guesses of the hidden cards replay to the observed table, within budget."""
+
+import random
+import time
+
+import pytest
+
+from bots import observe
+from mcts import MCTSBot
+from poker_engine import BOARD_SIZES, RAISE, PokerEngine, heuristic_action
+
+
+def decisions(hands=30, seed=2):
+    """Observations at every decision of some heuristic self-play hands."""
+    rng = random.Random(seed)
+    engine = PokerEngine(rng=seed)
+    for _ in range(hands):
+        for p in engine.players:
+            p.money = rng.choice([0, 40, 300, 1000, 2500])
+        if engine.players_with_money() < 2:
+            continue
+        engine.reset()
+        while not engine.is_terminal():
+            yield engine, observe(engine)
+            engine.apply(*heuristic_action(engine, rng))
+
+
+def starting_stacks(obs):
+    starting = list(obs.stacks)
+    for _, seat, _, paid in obs.history:
+        starting[seat] += paid
+    return starting
+
+
+def test_determinize_replays_to_the_observed_table():
+    bot = MCTSBot()
+    rng = random.Random(8)
+    seen = 0
+    for engine, obs in decisions():
+        guess = bot._determinize(obs, starting_stacks(obs), rng)
+        assert (guess.street, guess.current_player, guess.pot, guess.betOn) == \
+            (engine.street, engine.current_player, engine.pot, engine.betOn)
+        assert [p.money for p in guess.players] == [p.money for p in engine.players]
+        assert [p.round for p in guess.players] == [p.round for p in engine.players]
+        assert guess.tableCards[:BOARD_SIZES[obs.street]] == list(obs.board)
+        assert tuple(guess.players[obs.seat].cards) == obs.hole
+        assert guess.history == engine.history
+        seen += 1
+    assert seen > 100
+
+
+def test_act_keeps_to_its_budget():
+    budget = 0.05
+    bot = MCTSBot(budget=budget, rng=random.Random(3))
+    for _, obs in list(decisions(hands=3))[:8]:
+        start = time.perf_counter()
+        action, amount = bot.act(obs)
+        elapsed = time.perf_counter() - start
+        assert elapsed < budget + 0.05
+        assert bot.iterations > 0
+        assert action in obs.legal_actions
+        if action == RAISE:
+            low, high = obs.raise_bounds
+            assert low <= amount <= high
+
+
+@pytest.mark.parametrize("max_iterations", [1, 25])
+def test_act_stops_at_max_iterations(max_iterations):
+    bot = MCTSBot(budget=10.0, max_iterations=max_iterations, rng=random.Random(3))
+    _, obs = next(decisions(hands=1))
+    start = time.perf_counter()
+    bot.act(obs)
+    assert bot.iterations == max_iterations
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,38 @@
+"""Player stats with the button posting a blind."""
+
+from player_stats import PlayerStats
+from poker_engine import ALL_IN, FOLD, RAISE, PokerEngine
+
+
+def table(button, stacks=None):
+    engine = PokerEngine(rng=3, blind=20)
+    stats = PlayerStats()
+    engine.listeners.append(stats)
+    for p, stack in zip(engine.players, stacks or [1000] * 6):
+        p.money = stack
+    engine.reset(button=button)
+    assert engine.players[button].last_action == "Blind $20"
+    return engine, stats
+
+
+def test_posting_the_blind_and_folding_is_not_vpip():
+    engine, stats = table(button=0)
+    engine.apply(RAISE, 60)
+    for _ in range(5):
+        engine.apply(FOLD)
+    assert engine.is_terminal()
+    snapshot = stats.snapshot()
+    assert snapshot["Player 1"]["hands"] == 1
+    assert snapshot["Player 1"]["vpip"] == snapshot["Player 1"]["pfr"] == 0.0
+    assert snapshot["Player 2"]["vpip"] == snapshot["Player 2"]["pfr"] == 100.0
+
+
+def test_all_in_for_the_blind_is_a_call():
+    engine, stats = table(button=1, stacks=[1000, 1000, 20, 1000, 1000, 1000])
+    engine.apply(ALL_IN)
+    while not engine.is_terminal():
+        engine.apply(FOLD)
+    snapshot = stats.snapshot()
+    assert snapshot["Player 3"]["vpip"] == 100.0
+    assert snapshot["Player 3"]["pfr"] == 0.0
+    assert snapshot["Player 2"]["vpip"] == 0.0
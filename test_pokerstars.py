@@ -0,0 +1,72 @@
+"""Parsing PokerStars hands: cash amounts in cents, tournament amounts in chips."""
+
+from poker_engine import CHECK_CALL, FLOP, FOLD, PREFLOP, RAISE
+from pokerstars import POST, parse_card, parse_hand, split_hands
+
+CASH = """\
+PokerStars Hand #230000000001:  Hold'em No Limit ($0.50/$1.00 USD) - 2024/01/01 12:00:00 ET
+Table 'Alcyone' 6-max Seat #1 is the button
+Seat 1: Anna ($100 in chips)
+Seat 2: Boris ($57.25 in chips)
+Seat 4: Clara ($1,234.50 in chips)
+Boris: posts small blind $0.50
+Clara: posts big blind $1
+*** HOLE CARDS ***
+Dealt to Anna [Ah Kd]
+Anna: raises $2 to $3
+Boris: folds
+Clara: calls $2
+*** FLOP *** [2c 7d Th]
+Clara: checks
+Anna: bets $4.50
+Clara: folds
+Uncalled bet ($4.50) returned to Anna
+Anna collected $6.50 from pot
+*** SUMMARY ***
+Total pot $6.50 | Rake $0
+Board [2c 7d Th]
+"""
+
+TOURNAMENT = """\
+PokerStars Hand #230000000002: Tournament #3500000001, $10+$1 USD Hold'em No Limit - Level I (10/20) - 2024/01/01 12:00:00 ET
+Table '3500000001 1' 9-max Seat #2 is the button
+Seat 2: Anna (1500 in chips)
+Seat 5: Boris (1500 in chips)
+Anna: posts small blind 10
+Boris: posts big blind 20
+*** HOLE CARDS ***
+Anna: raises 40 to 60
+Boris: folds
+Uncalled bet (40) returned to Anna
+Anna collected 40 from pot
+*** SUMMARY ***
+Total pot 40 | Rake 0
+"""
+
+
+def test_cash_hand_in_cents():
+    hand = parse_hand(CASH)
+    assert hand.hand_id == 230000000001
+    assert (hand.table, hand.max_seats, hand.button, hand.seat_numbers) == ("Alcyone", 6, 0, [1, 2, 4])
+    assert [p.money for p in hand.players] == [10000, 5725, 123450]
+    assert hand.players[0].cards == [parse_card("Ah"), parse_card("Kd")]
+    assert hand.board == [parse_card(c) for c in ("2c", "7d", "Th")]
+    assert hand.actions == [(PREFLOP, 1, POST, 50), (PREFLOP, 2, POST, 100), (PREFLOP, 0, RAISE, 300),
+                            (PREFLOP, 1, FOLD, 0), (PREFLOP, 2, CHECK_CALL, 200),
+                            (FLOP, 2, CHECK_CALL, 0), (FLOP, 0, RAISE, 450), (FLOP, 2, FOLD, 0)]
+    assert hand.returned == [(0, 450)]
+    assert hand.awards == [(0, 650)]
+
+
+def test_tournament_hand_in_chips():
+    hand = parse_hand(TOURNAMENT)
+    assert [p.money for p in hand.players] == [1500, 1500]
+    assert hand.actions == [(PREFLOP, 0, POST, 10), (PREFLOP, 1, POST, 20), (PREFLOP, 0, RAISE, 50),
+                            (PREFLOP, 1, FOLD, 0)]
+    assert hand.returned == [(0, 40)]
+    assert hand.awards == [(0, 40)]
+
+
+def test_split_hands():
+    hands = split_hands(CASH + "\n\n" + TOURNAMENT)
+    assert [parse_hand(h).hand_id for h in hands] == [230000000001, 230000000002]
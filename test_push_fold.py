@@ -0,0 +1,32 @@
+"""Push/fold strategies: equilibria on every stack row, and the shipped table."""
+
+import numpy as np
+
+from preflop import NUM_CLASSES
+from push_fold import STACKS, default_table, exploitability, load_table, train, write_table
+
+
+def test_shipped_table_is_unexploitable_on_every_row():
+    table = default_table()
+    assert table.stacks == list(STACKS)
+    gains = exploitability(table.push, table.call, table.stacks)
+    assert gains.shape == (len(STACKS),)
+    assert np.all(np.abs(gains) < 1e-4)
+
+
+def test_training_converges_on_every_row():
+    push, call = train(300)
+    assert push.shape == call.shape == (len(STACKS), NUM_CLASSES)
+    assert np.all(exploitability(push, call) < 1e-3)
+    # Never shoving and never calling gives the whole pot away on every row
+    assert np.allclose(exploitability(np.zeros_like(push), np.zeros_like(call)), 1.0)
+
+
+def test_table_round_trip(tmp_path):
+    push, call = train(50, stacks=(2.0, 10.0))
+    path = str(tmp_path / "table.bin")
+    write_table(push, call, (2.0, 10.0), path)
+    table = load_table(path)
+    assert table.stacks == [2.0, 10.0]
+    assert np.abs(table.push - push).max() <= 0.5 / 255 + 1e-9
+    assert np.abs(table.call - call).max() <= 0.5 / 255 + 1e-9
@@ -0,0 +1,46 @@
+"""Self-play runs give the same results however the hands are split up."""
+
+import pytest
+
+import simulator
+from bots import BotRunner, HeuristicBot
+from hand_history import HandRecord, read_hands
+from simulator import simulate, simulate_chunks, simulate_hand
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(simulator, "CHUNK_SIZE", 50)
+
+
+def test_process_pool_matches_a_serial_run(small_chunks):
+    serial = simulate(230, workers=1, seed=5)
+    pooled = simulate(230, workers=2, seed=5)
+    for key in ("hands", "chip_deltas", "mean_delta", "stddev", "seed"):
+        assert pooled[key] == serial[key]
+    assert sum(serial["chip_deltas"]) == 0
+    chunks = list(simulate_chunks(230, workers=2, seed=5))
+    assert [len(c) for c in chunks] == [50, 50, 50, 50, 30]
+    assert sum(c.sum(axis=0) for c in chunks).tolist() == serial["chip_deltas"]
+
+
+def test_simulate_hand_deals_a_recorded_hand_again(tmp_path, small_chunks):
+    path = str(tmp_path / "hands.bin")
+    result = simulate(120, workers=2, seed=9, history_path=path)
+    records = list(read_hands(path))
+    assert len(records) == 120
+    for n in (0, 49, 50, 119):
+        assert HandRecord.from_engine(simulate_hand(n, result["seed"])) == records[n]
+
+
+@pytest.mark.parametrize("runners", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_latency_counts_every_decision_once(tmp_path, small_chunks, runners, workers):
+    bots = [BotRunner(HeuristicBot())] * 6 if runners else [HeuristicBot() for _ in range(6)]
+    path = str(tmp_path / "hands.bin")
+    result = simulate(170, bots=bots, workers=workers, seed=11, history_path=path)
+    decisions = [0] * 6
+    for record in read_hands(path):
+        for _, seat, _, _ in record.actions:
+            decisions[seat] += 1
+    assert [s["count"] for s in result["latency"]] == decisions
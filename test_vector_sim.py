@@ -0,0 +1,20 @@
+"""Lockstep tables play the same game as the process-pool simulator."""
+
+import numpy as np
+
+from simulator import simulate
+from vector_sim import simulate_lockstep
+
+HANDS = 8000
+
+
+def test_lockstep_statistics_match_the_process_pool():
+    lockstep = simulate_lockstep(HANDS, num_tables=1024, seed=3)
+    pooled = simulate(HANDS, workers=2, seed=3)
+    assert lockstep["hands"] == pooled["hands"] == HANDS
+    assert sum(lockstep["chip_deltas"]) == sum(pooled["chip_deltas"]) == 0
+    # Different random streams: compare the per-seat statistics, not the hands
+    a, b = np.array(lockstep["stddev"]), np.array(pooled["stddev"])
+    assert np.all(np.abs(a / b - 1) < 0.1)
+    error = np.sqrt((a ** 2 + b ** 2) / HANDS)
+    assert np.all(np.abs(np.array(lockstep["mean_delta"]) - pooled["mean_delta"]) < 4 * error)